@@ -0,0 +1,25 @@
+"""Measures how LongestMatchFilter scales with the number of candidate entities.
+
+Usage:
+  python -m benchmarks.bench_entity_filters
+"""
+
+import timeit
+
+from seqlabel.entity_filters import LongestMatchFilter
+
+from .generators import generate_entities
+
+
+def main() -> None:
+    entity_filter = LongestMatchFilter()
+    print(f"{'entities':>10} {'seconds':>10} {'us/entity':>10}")
+    for n in (1_000, 10_000, 100_000, 1_000_000):
+        entities = generate_entities(n)
+        number = max(1, 100_000 // n)
+        seconds = min(timeit.repeat(lambda: entity_filter(entities), number=number, repeat=3)) / number
+        print(f"{n:>10} {seconds:>10.4f} {seconds / n * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
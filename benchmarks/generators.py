@@ -0,0 +1,99 @@
+"""Synthetic gazetteers, corpora and entities for benchmarks.
+
+All generators are seeded, so the same arguments always produce the same data.
+"""
+
+import random
+import string
+from typing import Dict, List
+
+from seqlabel.core import Entity, StringSequence, Text, TokenizedText
+
+# Patterns and filler are drawn from disjoint alphabets, so matches only come from inserted patterns.
+PATTERN_ALPHABET = string.ascii_lowercase
+FILLER_ALPHABET = string.ascii_uppercase + string.digits
+
+
+def generate_gazetteer(
+    size: int, min_length: int = 2, max_length: int = 8, n_labels: int = 4, seed: int = 0
+) -> Dict[str, str]:
+    """Generates a dictionary of random patterns and labels.
+
+    Args:
+      size: The number of patterns.
+      min_length: The minimum length of a pattern.
+      max_length: The maximum length of a pattern.
+      n_labels: The number of distinct labels.
+      seed: A random seed.
+
+    Returns:
+      A dictionary mapping patterns to labels.
+    """
+    rng = random.Random(seed)
+    gazetteer: Dict[str, str] = {}
+    while len(gazetteer) < size:
+        length = rng.randint(min_length, max_length)
+        pattern = "".join(rng.choices(PATTERN_ALPHABET, k=length))
+        gazetteer[pattern] = f"LABEL{rng.randrange(n_labels)}"
+    return gazetteer
+
+
+def generate_corpus(
+    n_documents: int,
+    length: int,
+    gazetteer: Dict[str, str],
+    density: float = 0.1,
+    tokenized: bool = False,
+    seed: int = 0,
+) -> List[StringSequence]:
+    """Generates documents mixing random filler and patterns of a gazetteer.
+
+    Args:
+      n_documents: The number of documents.
+      length: The approximate number of characters in a document.
+      gazetteer: A dictionary whose patterns are inserted into documents.
+      density: The probability that each token of a document is a pattern instead of filler.
+      tokenized: If True, documents are TokenizedText whose patterns are whole tokens and
+        whose filler is split into tokens of one to four characters. Otherwise, Text.
+      seed: A random seed.
+
+    Returns:
+      A list of documents.
+    """
+    rng = random.Random(seed)
+    patterns = sorted(gazetteer)
+    documents: List[StringSequence] = []
+    for _ in range(n_documents):
+        tokens: List[str] = []
+        size = 0
+        while size < length:
+            if rng.random() < density:
+                token = rng.choice(patterns)
+            else:
+                token = "".join(rng.choices(FILLER_ALPHABET, k=rng.randint(1, 4)))
+            tokens.append(token)
+            size += len(token)
+        if tokenized:
+            documents.append(TokenizedText(tokens, [False] * len(tokens)))
+        else:
+            documents.append(Text("".join(tokens)))
+    return documents
+
+
+def generate_entities(n: int, max_length: int = 10, seed: int = 0) -> List[Entity]:
+    """Generates dense candidate entities, about one starting at every character.
+
+    Args:
+      n: The number of entities.
+      max_length: The maximum length of an entity.
+      seed: A random seed.
+
+    Returns:
+      A list of possibly overlapping entities.
+    """
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(n):
+        start_offset = rng.randrange(n)
+        entities.append(Entity(start_offset, start_offset + rng.randrange(max_length), "LABEL"))
+    return entities
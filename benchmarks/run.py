@@ -0,0 +1,204 @@
+"""Measures matchers, filters, serializers and TokenizedText construction on synthetic data.
+
+Throughput is reported in documents and tokens per second, where a token is an item of a
+text: a character of Text or a token of TokenizedText. Peak memory is the peak of memory
+allocated by one run, measured by tracemalloc. Results can be saved and compared with a
+stored baseline, and the command exits with status 1 if any case regresses.
+
+Usage:
+  python -m benchmarks.run [--quick] [--output results.json]
+  python -m benchmarks.run --baseline benchmarks/baseline.json [--tolerance 0.2]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from seqlabel.core import Entity, StringSequence, TokenizedText
+from seqlabel.entity_filters import EntityFilter, LongestMatchFilter, MaximizedMatchFilter
+from seqlabel.matchers import DictionaryMatcher, Matcher
+from seqlabel.serializers import IOB2Serializer, JSONLSerializer, Serializer
+
+from .generators import generate_corpus, generate_gazetteer
+
+# The number of characters in a corpus of each case, split into documents of the given length.
+CORPUS_SIZE = 200_000
+
+CONFIGS: Dict[str, Dict[str, Sequence[Any]]] = {
+    # A subset of "full", so its results can be compared with a baseline saved from "full".
+    "quick": {"dictionary_sizes": (1_000,), "lengths": (100,), "densities": (0.05,)},
+    "full": {"dictionary_sizes": (1_000, 100_000), "lengths": (100, 10_000), "densities": (0.05, 0.3)},
+}
+
+Case = Tuple[str, Callable[[], Any], Sequence[StringSequence]]
+
+
+class Result(NamedTuple):
+    documents_per_second: float
+    tokens_per_second: float
+    peak_memory: int
+
+
+def measure(func: Callable[[], Any], documents: Sequence[StringSequence], repeat: int) -> Result:
+    """Measures the best time of repeated runs and the peak memory of a single call.
+
+    Args:
+      func: A function processing documents.
+      documents: Documents processed by func.
+      repeat: The number of timed runs.
+
+    Returns:
+      Throughput and peak memory in bytes.
+    """
+    timer = timeit.Timer(func)
+    # Each timed run loops for at least 0.2 seconds to reduce noise on short cases.
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat, number)) / number
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    n_tokens = sum(len(document) for document in documents)
+    return Result(len(documents) / seconds, n_tokens / seconds, peak_memory)
+
+
+def _build_tokenized_texts(token_lists: List[Tuple[List[str], List[bool]]]) -> List[TokenizedText]:
+    return [TokenizedText(tokens, space_after) for tokens, space_after in token_lists]
+
+
+def _match(matcher: Matcher, corpus: List[StringSequence]) -> List[List[Entity]]:
+    return [matcher.match(text) for text in corpus]
+
+
+def _filter(entity_filter: EntityFilter, entities: List[List[Entity]]) -> List[List[Entity]]:
+    return [entity_filter(e) for e in entities]
+
+
+def _serialize(serializer: Serializer, corpus: List[StringSequence], entities: List[List[Entity]]) -> List[str]:
+    return [serializer.save(text, e) for text, e in zip(corpus, entities)]
+
+
+def iter_cases(config: Dict[str, Sequence[Any]]) -> Iterator[Case]:
+    """Builds data and yields benchmark cases for a config.
+
+    Args:
+      config: Dictionary sizes, document lengths and entity densities to cover.
+
+    Returns:
+      An iterator of tuples of a case name, a function to measure and documents it processes.
+    """
+    for length in config["lengths"]:
+        corpus = generate_corpus(CORPUS_SIZE // length, length, generate_gazetteer(1_000), tokenized=True)
+        token_lists = [(text.tokens, text.space_after) for text in corpus if isinstance(text, TokenizedText)]
+        yield f"tokenized_text length={length}", partial(_build_tokenized_texts, token_lists), corpus
+
+    for dictionary_size in config["dictionary_sizes"]:
+        gazetteer = generate_gazetteer(dictionary_size)
+        matcher = DictionaryMatcher()
+        matcher.add(gazetteer)
+        boundary_matcher = DictionaryMatcher(token_boundary=True)
+        boundary_matcher.add(gazetteer)
+        for length in config["lengths"]:
+            for density in config["densities"]:
+                params = f"dictionary={dictionary_size} length={length} density={density}"
+                raw = generate_corpus(CORPUS_SIZE // length, length, gazetteer, density)
+                tokenized = generate_corpus(CORPUS_SIZE // length, length, gazetteer, density, tokenized=True)
+                yield f"match[raw] {params}", partial(_match, matcher, raw), raw
+                yield f"match[tokenized] {params}", partial(_match, matcher, tokenized), tokenized
+                yield f"match[token_boundary] {params}", partial(_match, boundary_matcher, tokenized), tokenized
+
+                if dictionary_size != config["dictionary_sizes"][0]:
+                    continue
+                entities = _match(matcher, raw)
+                yield from _filter_and_serializer_cases(params, raw, entities)
+
+
+def _filter_and_serializer_cases(
+    params: str, corpus: List[StringSequence], entities: List[List[Entity]]
+) -> Iterator[Case]:
+    for name, entity_filter in (("longest", LongestMatchFilter()), ("maximized", MaximizedMatchFilter())):
+        yield f"filter[{name}] {params}", partial(_filter, entity_filter, entities), corpus
+
+    filtered = _filter(LongestMatchFilter(), entities)
+    for name, serializer in (("jsonl", JSONLSerializer()), ("iob2", IOB2Serializer())):
+        yield f"serializer[{name}] {params}", partial(_serialize, serializer, corpus, filtered), corpus
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result], tolerance: float) -> List[str]:
+    """Finds cases slower or using more memory than a baseline beyond a tolerance.
+
+    Args:
+      results: Current results by case name.
+      baseline: Baseline results by case name. Cases missing in either are skipped.
+      tolerance: An allowed relative change, e.g. 0.2 for 20%.
+
+    Returns:
+      A list of messages describing regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result.documents_per_second < base.documents_per_second * (1 - tolerance):
+            ratio = result.documents_per_second / base.documents_per_second
+            regressions.append(f"{name}: throughput {ratio:.2f}x of baseline")
+        if result.peak_memory > base.peak_memory * (1 + tolerance):
+            ratio = result.peak_memory / base.peak_memory
+            regressions.append(f"{name}: peak memory {ratio:.2f}x of baseline")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run a small config for a smoke test")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timed runs of each case")
+    parser.add_argument("--output", help="a path to save results as JSON, e.g. to update a baseline")
+    parser.add_argument("--baseline", help="a path of results saved by --output to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="an allowed relative regression")
+    args = parser.parse_args()
+
+    config_name = "quick" if args.quick else "full"
+    results: Dict[str, Result] = {}
+    print(f"{'case':<70} {'docs/s':>12} {'tokens/s':>12} {'peak KiB':>10}")
+    for name, func, documents in iter_cases(CONFIGS[config_name]):
+        result = measure(func, documents, args.repeat)
+        results[name] = result
+        print(
+            f"{name:<70} {result.documents_per_second:>12.1f} {result.tokens_per_second:>12.0f} "
+            f"{result.peak_memory / 1024:>10.1f}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            data = {
+                "config": config_name,
+                "python": platform.python_version(),
+                "results": {name: result._asdict() for name, result in results.items()},
+            }
+            json.dump(data, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {name: Result(**result) for name, result in json.load(f)["results"].items()}
+        if not baseline.keys() & results.keys():
+            print(f"No cases in common with {args.baseline}")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1 @@
-from .core import Entity, StringSequence, Text, TokenizedText  # NOQA
+from .core import Entity, EntityBatch, LabelVocab, StringSequence, Text, TokenizedText  # NOQA
@@ -0,0 +1,160 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from types import TracebackType
+from typing import Any, Iterable, List, Optional, Set, Tuple, Type
+
+from .core import StringSequence
+from .pipeline import Pipeline
+
+Request = Tuple[StringSequence, "asyncio.Future[str]"]
+
+
+def _label_batch(pipeline: Pipeline, texts: List[StringSequence]) -> List[Tuple[bool, Any]]:
+    results: List[Tuple[bool, Any]] = []
+    for text in texts:
+        try:
+            results.append((True, pipeline(text)))
+        except Exception as e:
+            results.append((False, e))
+    return results
+
+
+class AsyncLabeler:
+    """Asyncio facade of Pipeline running labeling in an executor.
+
+    Requests arriving together are grouped into micro-batches, so the event loop is never
+    blocked and per-call overhead is shared by a batch. At most max_pending requests wait
+    for dispatch and AsyncLabeler.label waits for room beyond that. A request cancelled
+    before its batch is dispatched is not labeled.
+
+    Args:
+      pipeline: Pipeline to run.
+      executor: An executor running batches. If not given, a thread pool with max_workers
+        threads is created and shut down on close.
+      max_workers: The maximum number of batches running at once.
+      max_batch_size: The maximum number of texts in a batch.
+      max_delay: Seconds to wait for more requests before dispatching a batch.
+      max_pending: The maximum number of requests waiting for dispatch.
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        executor: Optional[Executor] = None,
+        max_workers: int = 4,
+        max_batch_size: int = 64,
+        max_delay: float = 0.001,
+        max_pending: int = 1024,
+    ) -> None:
+        if max_workers < 1 or max_batch_size < 1 or max_pending < 1:
+            raise ValueError("max_workers, max_batch_size and max_pending must be positive integers.")
+        self._pipeline = pipeline
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self._max_workers = max_workers
+        self._max_batch_size = max_batch_size
+        self._max_delay = max_delay
+        self._max_pending = max_pending
+        self._queue: Optional["asyncio.Queue[Request]"] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self._running: Set["asyncio.Task[None]"] = set()
+        self._closed = False
+
+    def _start(self) -> "asyncio.Queue[Request]":
+        if self._closed:
+            raise RuntimeError("AsyncLabeler is closed.")
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_pending)
+            self._dispatcher = asyncio.ensure_future(self._dispatch(self._queue))
+        return self._queue
+
+    async def label(self, text: StringSequence) -> str:
+        """Labels a text.
+
+        Args:
+          text: A text to label.
+
+        Returns:
+          A serialized string.
+        """
+        queue = self._start()
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        await queue.put((text, future))
+        return await future
+
+    async def label_many(self, texts: Iterable[StringSequence]) -> List[str]:
+        """Labels texts concurrently.
+
+        Args:
+          texts: An iterable of texts to label.
+
+        Returns:
+          A list of serialized strings in input order.
+        """
+        return list(await asyncio.gather(*(self.label(text) for text in texts)))
+
+    async def _dispatch(self, queue: "asyncio.Queue[Request]") -> None:
+        semaphore = asyncio.Semaphore(self._max_workers)
+        while True:
+            batch = [await queue.get()]
+            try:
+                if self._max_delay > 0 and queue.qsize() < self._max_batch_size - 1:
+                    await asyncio.sleep(self._max_delay)
+                while len(batch) < self._max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                await semaphore.acquire()
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                semaphore.release()
+                continue
+            task = asyncio.ensure_future(self._run(batch, semaphore))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Request], semaphore: asyncio.Semaphore) -> None:
+        try:
+            texts = [text for text, _ in batch]
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(self._executor, _label_batch, self._pipeline, texts)
+            except Exception as e:
+                results = [(False, e)] * len(batch)
+            for (_, future), (ok, result) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(result)
+        finally:
+            semaphore.release()
+
+    async def close(self) -> None:
+        """Stops accepting requests, waits for running batches and cancels waiting requests."""
+        self._closed = True
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                future.cancel()
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self) -> "AsyncLabeler":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.close()
@@ -0,0 +1,50 @@
+"""Lazy loading of optional backends.
+
+Optional dependencies such as orjson, regex, zstandard and prometheus_client are imported
+on first use instead of when seqlabel is imported, which keeps imports fast for processes
+that never use them. A new backend is loaded the same way: check it with is_available
+where it is optional and get it with require where it is needed, never at module level.
+"""
+
+import importlib
+import sys
+from functools import lru_cache
+from importlib.util import find_spec
+from types import ModuleType
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """Checks if a module can be imported without importing it.
+
+    Args:
+      name: A module name.
+
+    Returns:
+      True if the module is installed.
+    """
+    return name in sys.modules or find_spec(name) is not None
+
+
+def require(name: str, feature: str, package: Optional[str] = None) -> ModuleType:
+    """Imports a module on first use.
+
+    Args:
+      name: A module name.
+      feature: A description of what requires the module, used in an error message.
+      package: A package name to install the module, which is the module name by default.
+
+    Returns:
+      The imported module.
+
+    Raises:
+      ImportError: If the module is not installed.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(f"{name} is required for {feature}. Install it by pip install {package or name}.")
@@ -0,0 +1,165 @@
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, List, NamedTuple, Optional, Tuple, TypeVar, cast
+
+from .core import Entity, StringSequence, Text, TokenizedText
+from .matchers import Matcher
+
+T = TypeVar("T")
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache in the same form as functools.lru_cache."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def text_key(text: StringSequence) -> Optional[Hashable]:
+    """Returns a key identifying the content of a text.
+
+    The string itself is a part of a key, so equal keys always mean equal texts. Python
+    caches the hash of a string, so a key is hashed once however many times it is looked up.
+
+    Args:
+      text: A text.
+
+    Returns:
+      A hashable key, or None for other types than Text and TokenizedText, whose content
+      cannot be compared.
+    """
+    if type(text) is Text:
+        return str(text)
+    if type(text) is TokenizedText:
+        # Offsets are kept in arrays, whose bytes are copied at C speed.
+        token_starts, token_ends = cast(Tuple[array, array], text.token_offsets())
+        return str(text), token_starts.tobytes(), token_ends.tobytes()
+    return None
+
+
+class LRUCache(Generic[T]):
+    """A thread-safe cache evicting the least recently used entry beyond maxsize.
+
+    Args:
+      maxsize: The maximum number of entries.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer.")
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, T]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Returns a cached value, counting a hit or a miss.
+
+        Args:
+          key: A key.
+
+        Returns:
+          A cached value, or None if it is missing.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        """Caches a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+          key: A key.
+          value: A value, which must not be None.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        """Returns hits, misses, maxsize and the current size."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        """Removes all entries and resets statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+
+class CachedMatcher(Matcher):
+    """Matcher caching results of Matcher.match for repeated texts. Other attributes are delegated.
+
+    Results are keyed by the content of a text and the version of the matcher, so adding
+    or removing patterns invalidates them without clearing the cache. Texts other than Text
+    and TokenizedText are matched without the cache.
+
+    Args:
+      matcher: A matcher to cache results of.
+      maxsize: The maximum number of cached texts.
+    """
+
+    def __init__(self, matcher: Matcher, maxsize: int = 1024) -> None:
+        self._matcher = matcher
+        self._cache: LRUCache[List[Entity]] = LRUCache(maxsize)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._matcher, name)
+
+    @property
+    def version(self) -> int:
+        return self._matcher.version
+
+    def add(self, patterns: Dict) -> None:
+        self._matcher.add(patterns)
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        """Finds all sequences matching the supplied patterns, reusing a cached result.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          A new list of entities describing matches.
+        """
+        content = text_key(text)
+        if content is None:
+            return self._matcher.match(text)
+        # The version is read before matching, so a result is never cached under a newer version.
+        key = (content, self._matcher.version)
+        entities = self._cache.get(key)
+        if entities is None:
+            entities = self._matcher.match(text)
+            self._cache.put(key, entities)
+        return list(entities)
+
+    def cache_info(self) -> CacheInfo:
+        """Returns hits, misses, maxsize and the current size of the cache."""
+        return self._cache.info()
+
+    def cache_clear(self) -> None:
+        """Removes all cached results and resets statistics."""
+        self._cache.clear()
@@ -1,8 +1,8 @@
+import threading
 from abc import abstractmethod
-from dataclasses import dataclass
-from typing import Iterator, List, Tuple, Union
-
-from tokenizations import get_alignments
+from array import array
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 
 class StringSequence:
@@ -31,6 +31,9 @@ class StringSequence:
     def __iter__(self) -> Iterator[str]:
         pass
 
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
 
 class Text(StringSequence):
     """A normal text.
@@ -77,6 +80,9 @@ class Text(StringSequence):
     def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
         return self._text[index]
 
+    def __len__(self) -> int:
+        return len(self._text)
+
     def __iter__(self) -> Iterator[str]:
         yield from self._text
 
@@ -91,17 +97,37 @@ class TokenizedText(StringSequence):
     """
 
     def __init__(self, tokens: List[str], space_after: List[bool]) -> None:
+        if len(tokens) != len(space_after):
+            raise ValueError("tokens and space_after must have the same length.")
+
         self._tokens = tokens
         self._space_after = space_after
 
-        mapping, _ = get_alignments(tokens, str(self))
-        start_boundaries = {}
-        end_boundaries = {}
-        for i, indices in enumerate(mapping):
-            start_boundaries[indices[0]] = i
-            end_boundaries[indices[-1]] = i
-        self._start_boundaries = start_boundaries
-        self._end_boundaries = end_boundaries
+        string = []
+        token_starts = array("q")
+        token_ends = array("q")
+        # Token indices by character offset, or -1 where no token starts or ends.
+        n = sum(map(len, tokens)) + sum(map(bool, space_after))
+        start_tokens = array("i", [-1]) * n
+        end_tokens = array("i", [-1]) * n
+        offset = 0
+        for i, (token, is_space) in enumerate(zip(tokens, space_after)):
+            if not token:
+                raise ValueError("Empty tokens are not allowed.")
+            string.append(token)
+            token_starts.append(offset)
+            start_tokens[offset] = i
+            offset += len(token)
+            token_ends.append(offset - 1)
+            end_tokens[offset - 1] = i
+            if is_space:
+                string.append(" ")
+                offset += 1
+        self._string = "".join(string)
+        self._token_starts = token_starts
+        self._token_ends = token_ends
+        self._start_tokens = start_tokens
+        self._end_tokens = end_tokens
 
     def validate_offsets(self, start_offset: int, end_offset: int) -> bool:
         """Checks if character offsets align with token offsets.
@@ -113,9 +139,9 @@ class TokenizedText(StringSequence):
         Returns:
           True if character offsets can be aligned, False otherwise.
         """
-        return (
-            start_offset <= end_offset and start_offset in self._start_boundaries and end_offset in self._end_boundaries
-        )
+        if not 0 <= start_offset <= end_offset < len(self._start_tokens):
+            return False
+        return self._start_tokens[start_offset] >= 0 and self._end_tokens[end_offset] >= 0
 
     def align_offsets(self, start_offset: int, end_offset: int) -> Tuple[int, int]:
         """Converts character offsets to token offsets.
@@ -127,43 +153,288 @@ class TokenizedText(StringSequence):
         Returns:
           A tuple of token offsets.
         """
-        if not self.validate_offsets(start_offset, end_offset):
-            raise ValueError("Invalid character offsets")
-        return self._start_boundaries[start_offset], self._end_boundaries[end_offset]
+        if 0 <= start_offset <= end_offset < len(self._start_tokens):
+            start = self._start_tokens[start_offset]
+            end = self._end_tokens[end_offset]
+            if start >= 0 and end >= 0:
+                return start, end
+        raise ValueError("Invalid character offsets")
+
+    @property
+    def tokens(self) -> List[str]:
+        """A list of tokens."""
+        return self._tokens
+
+    @property
+    def space_after(self) -> List[bool]:
+        """A list of boolean indicating if a space is inserted after a token."""
+        return self._space_after
+
+    def token_offsets(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """Returns character offsets of each token.
+
+        Returns:
+          A tuple of sequences of character offsets for start and end positions of tokens.
+        """
+        return self._token_starts, self._token_ends
 
     def __str__(self) -> str:
         """Returns an original text before tokenization."""
-        string = []
-        for token, is_space in zip(self._tokens, self._space_after):
-            string.append(token)
-            if is_space:
-                string.append(" ")
-        return "".join(string)
+        return self._string
 
     def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
         return self._tokens[index]
 
+    def __len__(self) -> int:
+        return len(self._tokens)
+
     def __iter__(self) -> Iterator[str]:
         yield from self._tokens
 
 
-@dataclass
-class Entity:
+class Entity(tuple):
     """An entity with a label.
 
+    Entities are immutable tuples of their attributes, so creating one costs a single
+    allocation.
+
     Attributes:
       start_offset: A character-offset integer with an entity starting.
       end_offset: A character-offset integer with an entity ending.
       label: A label string.
+      score: A confidence score of an entity.
+    """
+
+    __slots__ = ()
+
+    if TYPE_CHECKING:
+        start_offset: int
+        end_offset: int
+        label: str
+        score: float
+    else:
+        # itemgetter reads a field at C speed, unlike a property defined in Python.
+        start_offset = property(itemgetter(0))
+        end_offset = property(itemgetter(1))
+        label = property(itemgetter(2))
+        score = property(itemgetter(3))
+
+    def __new__(cls, start_offset: int, end_offset: int, label: str, score: float = 1.0) -> "Entity":
+        if end_offset < start_offset:
+            raise ValueError("Invalid character-offset integers are given.")
+        return tuple.__new__(cls, (start_offset, end_offset, label, score))
+
+    # dataclasses imports inspect, which takes longer than the rest of seqlabel, so it is only
+    # imported to raise the same error as a frozen dataclass.
+    def __setattr__(self, name: str, value: Any) -> None:
+        from dataclasses import FrozenInstanceError
+
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        from dataclasses import FrozenInstanceError
+
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __reduce__(self) -> Tuple[type, Tuple[int, int, str, float]]:
+        return self.__class__, tuple(self)  # type: ignore
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(start_offset={self[0]!r}, end_offset={self[1]!r}, "
+            f"label={self[2]!r}, score={self[3]!r})"
+        )
+
+    # Other objects are never equal, since tuple comparison would be tried after NotImplemented.
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Entity) and tuple.__eq__(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __len__(self) -> int:
+        return self[1] - self[0] + 1
+
+
+class LabelVocab:
+    """Interns labels to small integer IDs.
+
+    IDs are assigned in order of registration and never change, so a vocabulary can be
+    shared by matchers, entity batches and serializers which then refer to labels by ID.
+    New labels are registered under a lock, so a vocabulary can be shared by threads.
+
+    Attributes:
+      labels: A list of label strings indexed by label IDs.
+
+    Args:
+      labels: An iterable of labels registered in advance.
     """
 
-    start_offset: int
-    end_offset: int
-    label: str
+    def __init__(self, labels: Optional[Iterable[str]] = None) -> None:
+        self.labels: List[str] = []
+        self._label_to_id: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        for label in labels or ():
+            self.label_id(label)
 
-    def __post_init__(self) -> None:
-        if self.end_offset < self.start_offset:
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def label_id(self, label: str) -> int:
+        """Returns the ID of a label, registering the label if it is new.
+
+        Args:
+          label: A label string.
+
+        Returns:
+          A label ID.
+        """
+        label_id = self._label_to_id.get(label)
+        if label_id is not None:
+            return label_id
+        with self._lock:
+            label_id = self._label_to_id.get(label)
+            if label_id is None:
+                # The label is listed before it is mapped, so a mapped ID always has a label.
+                label_id = len(self.labels)
+                self.labels.append(label)
+                self._label_to_id[label] = label_id
+        return label_id
+
+    def __contains__(self, label: object) -> bool:
+        return label in self._label_to_id
+
+    def __getitem__(self, label_id: int) -> str:
+        return self.labels[label_id]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class EntityBatch:
+    """Entities stored column-wise in parallel arrays.
+
+    Labels are interned to integer IDs, so no Python object is created per entity.
+
+    Attributes:
+      start_offsets: An array of character-offset integers with entities starting.
+      end_offsets: An array of character-offset integers with entities ending.
+      label_ids: An array of label IDs, which are indices of labels.
+      scores: An array of confidence scores of entities.
+      vocab: LabelVocab interning labels.
+
+    Args:
+      labels: A list of labels registered in advance.
+      vocab: LabelVocab to intern labels to. Batches and serializers sharing a vocabulary
+        share label IDs. A new vocabulary is created by default.
+    """
+
+    def __init__(self, labels: Optional[List[str]] = None, vocab: Optional[LabelVocab] = None) -> None:
+        self.start_offsets = array("q")
+        self.end_offsets = array("q")
+        self.label_ids = array("i")
+        self.scores = array("d")
+        self.vocab = vocab if vocab is not None else LabelVocab()
+        for label in labels or ():
+            self.vocab.label_id(label)
+
+    @property
+    def labels(self) -> List[str]:
+        """A list of label strings indexed by label IDs."""
+        return self.vocab.labels
+
+    @classmethod
+    def from_entities(cls, entities: Iterable[Entity], vocab: Optional[LabelVocab] = None) -> "EntityBatch":
+        """Creates EntityBatch from entities.
+
+        Args:
+          entities: An iterable of entities.
+          vocab: LabelVocab to intern labels to. A new vocabulary is created by default.
+
+        Returns:
+          EntityBatch holding the given entities.
+        """
+        batch = cls(vocab=vocab)
+        for entity in entities:
+            batch.append(entity.start_offset, entity.end_offset, entity.label, entity.score)
+        return batch
+
+    def label_id(self, label: str) -> int:
+        """Returns the ID of a label, registering the label if it is new.
+
+        Args:
+          label: A label string.
+
+        Returns:
+          A label ID.
+        """
+        return self.vocab.label_id(label)
+
+    def append(self, start_offset: int, end_offset: int, label: str, score: float = 1.0) -> None:
+        """Appends an entity.
+
+        Args:
+          start_offset: A character-offset integer with an entity starting.
+          end_offset: A character-offset integer with an entity ending.
+          label: A label string.
+          score: A confidence score of an entity.
+        """
+        if end_offset < start_offset:
             raise ValueError("Invalid character-offset integers are given.")
+        self.start_offsets.append(start_offset)
+        self.end_offsets.append(end_offset)
+        self.label_ids.append(self.vocab.label_id(label))
+        self.scores.append(score)
+
+    def take(self, indices: Iterable[int]) -> "EntityBatch":
+        """Returns a new batch holding entities at the given positions.
+
+        Args:
+          indices: An iterable of positions of entities.
+
+        Returns:
+          EntityBatch sharing the vocabulary with this batch.
+        """
+        indices = list(indices)
+        batch = EntityBatch(vocab=self.vocab)
+        batch.start_offsets = array("q", [self.start_offsets[i] for i in indices])
+        batch.end_offsets = array("q", [self.end_offsets[i] for i in indices])
+        batch.label_ids = array("i", [self.label_ids[i] for i in indices])
+        batch.scores = array("d", [self.scores[i] for i in indices])
+        return batch
+
+    def spans(self) -> Iterator[Tuple[int, int, str]]:
+        """Iterates over character offsets and labels without creating entities.
+
+        Returns:
+          An iterator of tuples of start and end character offsets and a label.
+        """
+        labels = self.labels
+        for start_offset, end_offset, label_id in zip(self.start_offsets, self.end_offsets, self.label_ids):
+            yield start_offset, end_offset, labels[label_id]
 
     def __len__(self) -> int:
-        return self.end_offset - self.start_offset + 1
+        return len(self.start_offsets)
+
+    def __getitem__(self, index: int) -> Entity:
+        return Entity(
+            self.start_offsets[index],
+            self.end_offsets[index],
+            self.labels[self.label_ids[index]],
+            self.scores[index],
+        )
+
+    def __iter__(self) -> Iterator[Entity]:
+        labels = self.labels
+        for start_offset, end_offset, label_id, score in zip(
+            self.start_offsets, self.end_offsets, self.label_ids, self.scores
+        ):
+            yield Entity(start_offset, end_offset, labels[label_id], score)
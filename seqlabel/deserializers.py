@@ -0,0 +1,250 @@
+import json
+import os
+from abc import abstractmethod
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .backends import is_available, require
+from .core import Entity, StringSequence, Text, TokenizedText
+from .files import PathLike, open_text
+
+LoadedDocument = Tuple[StringSequence, List[Entity]]
+
+
+@contextmanager
+def _reading(file: Union[PathLike, IO[str]]) -> Iterator[IO[str]]:
+    if isinstance(file, (str, os.PathLike)):
+        with open_text(file, "r") as f:
+            yield f
+    else:
+        yield file
+
+
+def _build_text(tokens: List[str], tokenized: bool) -> Tuple[StringSequence, List[int], List[int]]:
+    start_offsets = []
+    end_offsets = []
+    offset = 0
+    for token in tokens:
+        start_offsets.append(offset)
+        offset += len(token)
+        end_offsets.append(offset - 1)
+    text: StringSequence
+    if tokenized:
+        text = TokenizedText(tokens, [False] * len(tokens))
+    else:
+        text = Text("".join(tokens))
+    return text, start_offsets, end_offsets
+
+
+class Deserializer:
+    """Base class of all deserializers."""
+
+    @abstractmethod
+    def load(self, string: str) -> LoadedDocument:
+        pass
+
+    @abstractmethod
+    def iter_load(self, file: Union[PathLike, IO[str]]) -> Iterator[LoadedDocument]:
+        pass
+
+
+class JSONLDeserializer(Deserializer):
+    """JSON format Deserializer reading output of JSONLSerializer.
+
+    Args:
+      tokenized: If True, a list of items is restored as TokenizedText without spaces,
+        otherwise as Text joining the items. Compact output is restored as it was saved.
+    """
+
+    def __init__(self, tokenized: bool = True) -> None:
+        self._tokenized = tokenized
+        self._loads = require("orjson", "JSONLDeserializer").loads if is_available("orjson") else json.loads
+
+    def load(self, string: str) -> LoadedDocument:
+        """Converts a JSON format string to a text and entities.
+
+        Args:
+          string: A JSON format string.
+
+        Returns:
+          A tuple of a text and a list of entities.
+        """
+        data: Dict[str, Any] = self._loads(string)
+        items = data["text"]
+        text: StringSequence
+        start_offsets: Sequence[int]
+        end_offsets: Sequence[int]
+        if isinstance(items, str):
+            text = Text(items)
+            start_offsets = end_offsets = range(len(items))
+        elif "space_after" in data:
+            tokenized_text = TokenizedText(items, data["space_after"])
+            text = tokenized_text
+            start_offsets, end_offsets = tokenized_text.token_offsets()
+        else:
+            text, start_offsets, end_offsets = _build_text(items, self._tokenized)
+        entities = [
+            Entity(start_offsets[tag["start_offset"]], end_offsets[tag["end_offset"]], tag["label"])
+            for tag in data["tags"]
+        ]
+        return text, entities
+
+    def iter_load(self, file: Union[PathLike, IO[str]]) -> Iterator[LoadedDocument]:
+        """Reads texts and entities from a JSONL file one document at a time.
+
+        Args:
+          file: A path or a file object opened in text mode.
+
+        Returns:
+          An iterator of tuples of a text and a list of entities.
+        """
+        with _reading(file) as f:
+            for line in f:
+                if line.strip():
+                    yield self.load(line)
+
+
+class TaggingDeserializer(Deserializer):
+    """Base class of deserializers reading output of TaggingSerializer.
+
+    Subclasses define a tagging scheme by the same prefixes as the corresponding serializer.
+
+    Args:
+      tokenized: If True, items are restored as TokenizedText without spaces, otherwise
+        as Text joining the items.
+      errors: How to handle malformed tag sequences. "strict" raises ValueError, "repair"
+        keeps entities by closing or opening them where needed, and "ignore" drops them.
+    """
+
+    begin_prefix: str
+    inside_prefix: str
+    last_prefix: str
+    unit_prefix: str
+
+    def __init__(self, tokenized: bool = True, errors: str = "strict") -> None:
+        if errors not in ("strict", "repair", "ignore"):
+            raise ValueError(f"Unknown errors: {errors}")
+        self._tokenized = tokenized
+        self._errors = errors
+        self._prefixes = {self.begin_prefix, self.inside_prefix, self.last_prefix, self.unit_prefix}
+
+    def _malformed(self, message: str) -> bool:
+        if self._errors == "strict":
+            raise ValueError(message)
+        return self._errors == "repair"
+
+    def _decode(self, tags: List[str]) -> List[Tuple[int, int, str]]:
+        begin, inside, last, unit = self.begin_prefix, self.inside_prefix, self.last_prefix, self.unit_prefix
+        explicit_end = last != inside
+        spans = []
+        start = 0
+        current: Optional[str] = None
+        for i, tag in enumerate(tags):
+            prefix, _, label = tag.partition("-")
+            if tag == "O":
+                prefix = "O"
+            elif not label or prefix not in self._prefixes:
+                self._malformed(f"Invalid tag {tag!r} at item {i}.")
+                prefix = "O"
+
+            if current is not None:
+                if prefix == inside and label == current:
+                    continue
+                if explicit_end and prefix == last and label == current:
+                    spans.append((start, i, current))
+                    current = None
+                    continue
+                if not explicit_end or self._malformed(f"Entity starting at item {start} is not closed."):
+                    spans.append((start, i - 1, current))
+                current = None
+
+            if prefix == "O":
+                continue
+            if prefix == begin:
+                start, current = i, label
+            elif prefix == unit:
+                spans.append((i, i, label))
+            elif self._malformed(f"Tag {tag!r} at item {i} has no beginning."):
+                if prefix == inside:
+                    start, current = i, label
+                else:
+                    spans.append((i, i, label))
+
+        if current is not None:
+            if not explicit_end or self._malformed(f"Entity starting at item {start} is not closed."):
+                spans.append((start, len(tags) - 1, current))
+        return spans
+
+    def _load_lines(self, lines: List[str]) -> LoadedDocument:
+        items = []
+        tags = []
+        for line in lines:
+            item, separator, tag = line.rpartition("\t")
+            if not separator:
+                raise ValueError(f"Invalid line: {line!r}")
+            items.append(item)
+            tags.append(tag)
+        text, start_offsets, end_offsets = _build_text(items, self._tokenized)
+        entities = [Entity(start_offsets[start], end_offsets[end], label) for start, end, label in self._decode(tags)]
+        return text, entities
+
+    def load(self, string: str) -> LoadedDocument:
+        """Converts a tagging format string to a text and entities.
+
+        Args:
+          string: A tagging format string with an item and a tag separated by a tab on each line.
+
+        Returns:
+          A tuple of a text and a list of entities.
+        """
+        return self._load_lines([line for line in string.split("\n") if line])
+
+    def iter_load(self, file: Union[PathLike, IO[str]]) -> Iterator[LoadedDocument]:
+        """Reads texts and entities from a CoNLL file one document at a time.
+
+        Documents are separated by blank lines.
+
+        Args:
+          file: A path or a file object opened in text mode.
+
+        Returns:
+          An iterator of tuples of a text and a list of entities.
+        """
+        with _reading(file) as f:
+            lines: List[str] = []
+            for line in f:
+                line = line.rstrip("\n")
+                if line:
+                    lines.append(line)
+                elif lines:
+                    yield self._load_lines(lines)
+                    lines = []
+            if lines:
+                yield self._load_lines(lines)
+
+
+class IOB2Deserializer(TaggingDeserializer):
+    """IOB2 format Deserializer."""
+
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "I"
+    unit_prefix = "B"
+
+
+class IOBESDeserializer(TaggingDeserializer):
+    """IOBES format Deserializer."""
+
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "E"
+    unit_prefix = "S"
+
+
+class BILOUDeserializer(TaggingDeserializer):
+    """BILOU format Deserializer."""
+
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "L"
+    unit_prefix = "U"
@@ -1,7 +1,8 @@
 from abc import abstractmethod
-from typing import List
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .core import Entity
+from .core import Entity, EntityBatch
 
 
 def overlap(a: Entity, b: Entity) -> bool:
@@ -24,9 +25,55 @@ class EntityFilter:
     def __call__(self, entities: List[Entity]) -> List[Entity]:
         pass
 
+    def filter_entity_batch(self, batch: EntityBatch) -> EntityBatch:
+        """Removes unwanted entities from EntityBatch.
+
+        Args:
+          batch: EntityBatch to filter.
+
+        Returns:
+          Filtered EntityBatch sharing the vocabulary with batch.
+        """
+        return EntityBatch.from_entities(self(list(batch)), batch.vocab)
+
+    def iter_filter(self, entities: Iterable[Entity]) -> Iterator[Entity]:
+        """Removes unwanted entities lazily.
+
+        Entities should be ordered by end offset, as Matcher.iter_match yields them. Filters
+        working online yield entities as soon as they are decided, and others collect all
+        entities first.
+
+        Args:
+          entities: An iterable of entities.
+
+        Returns:
+          An iterator of filtered entities.
+        """
+        yield from self(list(entities))
+
+
+def _check_order(entities: Iterable[Entity]) -> Iterator[Entity]:
+    end_offset = None
+    for entity in entities:
+        if end_offset is not None and entity.end_offset < end_offset:
+            raise ValueError("Entities must be ordered by end offset.")
+        end_offset = entity.end_offset
+        yield entity
+
 
 class LongestMatchFilter(EntityFilter):
-    """Entity filter prioritizes entity length."""
+    """Entity filter prioritizes entity length.
+
+    Args:
+      max_length: The maximum number of characters of an entity. If given, iter_filter
+        yields entities once no later entity can overlap them, so it only holds entities
+        within max_length characters. Otherwise, it collects all entities first.
+    """
+
+    def __init__(self, max_length: Optional[int] = None) -> None:
+        if max_length is not None and max_length < 1:
+            raise ValueError("max_length must be a positive integer.")
+        self._max_length = max_length
 
     def __call__(self, entities: List[Entity]) -> List[Entity]:
         """Removes overlapping entities and leaves the longest entity.
@@ -37,13 +84,67 @@ class LongestMatchFilter(EntityFilter):
         Returns:
           A list of entities without any overlaps.
         """
-        entities = sorted(entities, key=len, reverse=True)
-        filtered: List[Entity] = []
-        for cur in entities:
-            if all(not overlap(cur, prev) for prev in filtered):
-                filtered.append(cur)
-        filtered.sort(key=lambda entity: entity.start_offset)
-        return filtered
+        start_offsets = [entity.start_offset for entity in entities]
+        end_offsets = [entity.end_offset for entity in entities]
+        return [entities[i] for i in self._select(start_offsets, end_offsets)]
+
+    def filter_entity_batch(self, batch: EntityBatch) -> EntityBatch:
+        """Removes overlapping entities from EntityBatch and leaves the longest entity.
+
+        Args:
+          batch: EntityBatch to filter.
+
+        Returns:
+          EntityBatch without any overlaps.
+        """
+        return batch.take(self._select(batch.start_offsets, batch.end_offsets))
+
+    def iter_filter(self, entities: Iterable[Entity]) -> Iterator[Entity]:
+        """Removes overlapping entities lazily and leaves the longest entity.
+
+        Results are the same as LongestMatchFilter for entities in the same order.
+
+        Args:
+          entities: An iterable of entities ordered by end offset.
+
+        Returns:
+          An iterator of entities without any overlaps, ordered by start offset.
+        """
+        max_length = self._max_length
+        if max_length is None:
+            yield from self(list(entities))
+            return
+
+        # Entities after one ending at e start at e - max_length + 1 or later, so buffered
+        # entities ending before that never overlap them and can be decided.
+        window: List[Entity] = []
+        for entity in _check_order(entities):
+            if len(entity) > max_length:
+                raise ValueError(f"An entity is longer than max_length: {entity}")
+            if window and window[-1].end_offset <= entity.end_offset - max_length:
+                yield from self(window)
+                window = []
+            window.append(entity)
+        yield from self(window)
+
+    @staticmethod
+    def _select(start_offsets: Sequence[int], end_offsets: Sequence[int]) -> List[int]:
+        if not start_offsets:
+            return []
+        order = sorted(range(len(start_offsets)), key=lambda i: end_offsets[i] - start_offsets[i], reverse=True)
+        # Marks characters covered by accepted entities, so an overlap check costs O(len(entity)).
+        base = min(start_offsets)
+        occupied = bytearray(max(end_offsets) - base + 1)
+        selected = []
+        for i in order:
+            start = start_offsets[i] - base
+            end = end_offsets[i] - base + 1
+            if occupied.find(1, start, end) != -1:
+                continue
+            occupied[start:end] = b"\x01" * (end - start)
+            selected.append(i)
+        selected.sort(key=start_offsets.__getitem__)
+        return selected
 
 
 class MaximizedMatchFilter(EntityFilter):
@@ -58,11 +159,133 @@ class MaximizedMatchFilter(EntityFilter):
         Returns:
           A list of entities without any overlaps.
         """
-        entities = sorted(entities, key=lambda entity: entity.end_offset)
-        filtered: List[Entity] = []
-        for entity in entities:
-            if not filtered:
-                filtered.append(entity)
-            elif not overlap(filtered[-1], entity):
-                filtered.append(entity)
-        return filtered
+        start_offsets = [entity.start_offset for entity in entities]
+        end_offsets = [entity.end_offset for entity in entities]
+        return [entities[i] for i in self._select(start_offsets, end_offsets)]
+
+    def filter_entity_batch(self, batch: EntityBatch) -> EntityBatch:
+        """Removes overlapping entities from EntityBatch and leaves as many entities as possible.
+
+        Args:
+          batch: EntityBatch to filter.
+
+        Returns:
+          EntityBatch without any overlaps.
+        """
+        return batch.take(self._select(batch.start_offsets, batch.end_offsets))
+
+    def iter_filter(self, entities: Iterable[Entity]) -> Iterator[Entity]:
+        """Removes overlapping entities online and leaves as many entities as possible.
+
+        Each entity is decided as soon as it arrives, so no entity is held. Results are the
+        same as MaximizedMatchFilter for entities in the same order.
+
+        Args:
+          entities: An iterable of entities ordered by end offset.
+
+        Returns:
+          An iterator of entities without any overlaps.
+        """
+        last_end_offset = None
+        for entity in _check_order(entities):
+            if last_end_offset is None or last_end_offset < entity.start_offset:
+                yield entity
+                last_end_offset = entity.end_offset
+
+    @staticmethod
+    def _select(start_offsets: Sequence[int], end_offsets: Sequence[int]) -> List[int]:
+        selected = []
+        last_end_offset = None
+        for i in sorted(range(len(start_offsets)), key=end_offsets.__getitem__):
+            if last_end_offset is None or last_end_offset < start_offsets[i]:
+                selected.append(i)
+                last_end_offset = end_offsets[i]
+        return selected
+
+
+class WeightedMatchFilter(EntityFilter):
+    """Entity filter prioritizes the total weight of entities.
+
+    Args:
+      weight: A function returning the weight of an entity. If not given, entity scores are used.
+        For example, ``lambda entity: priorities[entity.label]`` prioritizes labels.
+    """
+
+    def __init__(self, weight: Optional[Callable[[Entity], float]] = None) -> None:
+        self._weight = weight
+
+    def __call__(self, entities: List[Entity]) -> List[Entity]:
+        """Removes overlapping entities and leaves entities with the maximum total weight.
+
+        Args:
+          entities: A list of entities.
+
+        Returns:
+          A list of entities without any overlaps.
+        """
+        return self.split(entities)[0]
+
+    def split(self, entities: List[Entity]) -> Tuple[List[Entity], List[Entity]]:
+        """Splits entities into ones left and ones removed by WeightedMatchFilter.
+
+        It solves weighted interval scheduling in O(n log n). If several selections have the
+        same total weight, the one ending earliest is left.
+
+        Args:
+          entities: A list of entities.
+
+        Returns:
+          A tuple of a list of entities without any overlaps and a list of removed entities.
+        """
+        if self._weight is None:
+            weights = [entity.score for entity in entities]
+        else:
+            weights = [self._weight(entity) for entity in entities]
+        start_offsets = [entity.start_offset for entity in entities]
+        end_offsets = [entity.end_offset for entity in entities]
+        selected, removed = self._split(start_offsets, end_offsets, weights)
+        return [entities[i] for i in selected], [entities[i] for i in removed]
+
+    def filter_entity_batch(self, batch: EntityBatch) -> EntityBatch:
+        """Removes overlapping entities from EntityBatch and leaves ones with the maximum total weight.
+
+        Args:
+          batch: EntityBatch to filter.
+
+        Returns:
+          EntityBatch without any overlaps.
+        """
+        if self._weight is None:
+            weights: Sequence[float] = batch.scores
+        else:
+            weights = [self._weight(entity) for entity in batch]
+        selected, _ = self._split(batch.start_offsets, batch.end_offsets, weights)
+        return batch.take(selected)
+
+    @staticmethod
+    def _split(
+        start_offsets: Sequence[int], end_offsets: Sequence[int], weights: Sequence[float]
+    ) -> Tuple[List[int], List[int]]:
+        order = sorted(range(len(start_offsets)), key=end_offsets.__getitem__)
+        sorted_end_offsets = [end_offsets[i] for i in order]
+
+        # best[k] is the maximum total weight of the first k entities in end-offset order.
+        n = len(order)
+        best = [0.0] * (n + 1)
+        previous = [0] * n
+        for k, i in enumerate(order):
+            previous[k] = bisect_left(sorted_end_offsets, start_offsets[i], 0, k)
+            best[k + 1] = max(best[k], best[previous[k]] + weights[i])
+
+        kept = [False] * n
+        k = n
+        while k > 0:
+            if best[k] == best[k - 1]:
+                k -= 1
+            else:
+                kept[k - 1] = True
+                k = previous[k - 1]
+
+        selected = [i for i, is_kept in zip(order, kept) if is_kept]
+        removed = [i for i, is_kept in zip(order, kept) if not is_kept]
+        return selected, removed
@@ -0,0 +1,32 @@
+import gzip
+import os
+from typing import IO, Optional, Union, cast
+
+from .backends import require
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def open_text(path: PathLike, mode: str = "r", compression: Optional[str] = None) -> IO[str]:
+    """Opens a UTF-8 text file, which may be compressed.
+
+    Args:
+      path: A path to a file.
+      mode: "r" for reading or "w" for writing.
+      compression: "gzip", "zstd" or None. If None, it is inferred from the suffix of a path.
+
+    Returns:
+      A file object opened in text mode.
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"Unknown mode: {mode}")
+    if compression is None:
+        suffix = os.path.splitext(os.fspath(path))[1]
+        compression = {".gz": "gzip", ".zst": "zstd"}.get(suffix)
+    if compression is None:
+        return open(path, mode, encoding="utf-8")
+    if compression == "gzip":
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    if compression == "zstd":
+        return require("zstandard", "zstd compression").open(path, mode + "t", encoding="utf-8")
+    raise ValueError(f"Unknown compression: {compression}")
@@ -1,39 +1,526 @@
+import itertools
+import json
+import os
+import pickle
+import re
+import sys
+import threading
+import typing
+import unicodedata
+import zlib
 from abc import abstractmethod
-from typing import Dict, List
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from functools import lru_cache, partial
+from heapq import merge
+from operator import itemgetter
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
 
-from ahocorasick import Automaton
+from ahocorasick import STORE_INTS, Automaton, load
 
-from .core import Entity, StringSequence
+from .backends import require
+from .core import Entity, EntityBatch, LabelVocab, StringSequence, TokenizedText
+
+if typing.TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
 
 
 class Matcher:
     """Base class of all matchers."""
 
+    # Increased by subclasses whenever their patterns change.
+    _version = 0
+
     @abstractmethod
     def add(self, patterns: Dict) -> None:
         pass
 
+    @property
+    def version(self) -> int:
+        """A number increasing whenever patterns change, which invalidates cached results."""
+        return self._version
+
     @abstractmethod
     def match(self, text: StringSequence) -> List[Entity]:
         pass
 
+    def match_entity_batch(self, text: StringSequence) -> EntityBatch:
+        """Finds all sequences matching the supplied patterns as EntityBatch.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          EntityBatch describing matches.
+        """
+        return EntityBatch.from_entities(self.match(text))
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        """Finds all sequences matching the supplied patterns lazily.
+
+        Entities are yielded in the same order as Matcher.match.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          An iterator of entities describing matches.
+        """
+        yield from self.match(text)
+
+    def match_batch(self, texts: Iterable[StringSequence]) -> List[List[Entity]]:
+        """Finds all sequences matching the supplied patterns in each of texts.
+
+        Args:
+          texts: An iterable of texts to match over.
+
+        Returns:
+          A list of lists of entities in the same order as texts.
+        """
+        return [self.match(text) for text in texts]
+
+    def _match(self, text: StringSequence) -> Tuple[List[Entity], int]:
+        # Returns entities and the number of candidates rejected for not aligning with items.
+        return self.match(text), 0
+
+    def _match_entity_batch(self, text: StringSequence) -> Tuple[EntityBatch, int]:
+        return self.match_entity_batch(text), 0
+
+
+@lru_cache(maxsize=None)
+def _composition_seconds() -> FrozenSet[str]:
+    # Characters which can compose with a preceding character under NFC and NFKC.
+    seconds = {chr(cp) for cp in range(0x1161, 0x1176)} | {chr(cp) for cp in range(0x11A8, 0x11C3)}
+    for cp in range(sys.maxunicode + 1):
+        decomposition = unicodedata.decomposition(chr(cp))
+        if decomposition and not decomposition.startswith("<"):
+            parts = decomposition.split()
+            if len(parts) == 2:
+                seconds.add(chr(int(parts[1], 16)))
+    return frozenset(seconds)
+
+
+class _CharTables(typing.NamedTuple):
+    # Per-character tables of a normalizer, replaced together as new characters are seen.
+    known: FrozenSet[str]
+    starters: Dict[str, bool]
+    complex: FrozenSet[str]
+    complex_pattern: Optional[Pattern[str]]
+
+
+class _Normalizer:
+    """Normalizes a string keeping a map between normalized and original offsets.
+
+    A string is split into segments, each of which is a starter with following characters
+    which may combine with it, such as combining marks or a half-width voiced sound mark.
+    Normalization never crosses a starter, so segments are normalized one by one and each
+    normalized character belongs to exactly one segment.
+
+    Most characters form a segment by themselves and are normalized to one character. Runs of
+    such characters are normalized at once with identity offset maps, and segments are only
+    built one by one around other characters. Per-character tables grow as new characters
+    are seen. They are rebuilt under a lock and replaced at once, and each call uses the
+    tables it learned into, so a normalizer can be shared by threads.
+    """
+
+    def __init__(self, form: Optional[str], casefold: bool) -> None:
+        if form not in (None, "NFC", "NFKC", "NFD", "NFKD"):
+            raise ValueError(f"Unknown normalization: {form}")
+        self._form: Any = form
+        self._casefold = casefold
+        self._tables = _CharTables(frozenset(), {}, frozenset(), None)
+        self._lock = threading.Lock()
+
+    def __reduce__(self) -> Tuple[Callable[[Optional[str], bool], "_Normalizer"], Tuple[Optional[str], bool]]:
+        return _get_normalizer, (self._form, self._casefold)
+
+    def _normalize(self, segment: str) -> str:
+        if self._form is not None:
+            segment = unicodedata.normalize(self._form, segment)
+        if self._casefold:
+            segment = segment.casefold()
+        return segment
+
+    def _is_starter(self, char: str) -> bool:
+        # True if a character never combines with preceding characters.
+        form = self._form
+        if form is None:
+            return True
+        first = unicodedata.normalize("NFKD" if form.startswith("NFK") else "NFD", char)[0]
+        return unicodedata.combining(first) == 0 and first not in _composition_seconds()
+
+    def _learn(self, string: str) -> _CharTables:
+        # Returns tables covering every character of a string.
+        tables = self._tables
+        if not set(string).difference(tables.known):
+            return tables
+        with self._lock:
+            tables = self._tables
+            new_chars = set(string).difference(tables.known)
+            if not new_chars:
+                return tables
+            starters = dict(tables.starters)
+            complex_chars = set(tables.complex)
+            for char in new_chars:
+                starters[char] = is_starter = self._is_starter(char)
+                if not is_starter or len(self._normalize(char)) != 1:
+                    complex_chars.add(char)
+            complex_pattern = tables.complex_pattern
+            if len(complex_chars) != len(tables.complex):
+                complex_pattern = re.compile("[" + "".join(map(re.escape, sorted(complex_chars))) + "]")
+            tables = _CharTables(frozenset(starters), starters, frozenset(complex_chars), complex_pattern)
+            self._tables = tables
+        return tables
+
+    def __call__(self, string: str) -> str:
+        return self.map(string)[0]
+
+    def stable_length(self, string: str) -> int:
+        """Returns the length of the longest prefix normalized the same whatever follows it.
+
+        Args:
+          string: A string which may be continued.
+
+        Returns:
+          The offset of the last starter, or the length of a string if every character is a
+          segment by itself.
+        """
+        if self._form is None:
+            return len(string)
+        starters = self._learn(string).starters
+        for i in range(len(string) - 1, -1, -1):
+            if starters[string[i]]:
+                return i
+        return 0
+
+    def map_text(self, text: StringSequence) -> Tuple[str, Sequence[int], Sequence[int], Sequence[int]]:
+        """Normalizes a text.
+
+        Segments never cross token boundaries of TokenizedText, so each token is normalized
+        on its own.
+
+        Args:
+          text: A text to normalize.
+
+        Returns:
+          The same as _Normalizer.map.
+        """
+        boundaries: List[int] = []
+        if isinstance(text, TokenizedText):
+            token_starts, token_ends = text.token_offsets()
+            boundaries.extend(token_starts)
+            boundaries.extend(end_offset + 1 for end_offset in token_ends)
+        return self.map(str(text), boundaries)
+
+    def map(
+        self, string: str, boundaries: Iterable[int] = ()
+    ) -> Tuple[str, Sequence[int], Sequence[int], Sequence[int]]:
+        """Normalizes a string.
+
+        Args:
+          string: A string to normalize.
+          boundaries: Offsets where a segment always starts, e.g. token starts.
+
+        Returns:
+          A tuple of a normalized string and three maps. The first two map each normalized
+          character to the start and the end offset of its original segment, or -1 unless it
+          is the first or the last character of the segment. The last maps each original
+          offset and the length of a string to the normalized offset of a segment starting
+          there, or -1 inside a segment.
+        """
+        tables = self._learn(string)
+        complex_pattern = tables.complex_pattern
+
+        n = len(string)
+        clusters: List[Tuple[int, int]] = []
+        starters = tables.starters
+        if complex_pattern is not None:
+            # A cluster covers complex characters and a starter preceding a non-starter.
+            for match in complex_pattern.finditer(string):
+                i = match.start()
+                cluster_start = i - 1 if i > 0 and not starters[string[i]] else i
+                if clusters and cluster_start <= clusters[-1][1]:
+                    clusters[-1] = (clusters[-1][0], i + 1)
+                else:
+                    clusters.append((cluster_start, i + 1))
+        if not clusters:
+            return self._normalize(string), range(n), range(n), range(n + 1)
+
+        forced = set(boundaries)
+        pieces = []
+        starts = array("q")
+        ends = array("q")
+        positions = array("q", [-1]) * (n + 1)
+        size = 0
+        offset = 0
+        for cluster_start, cluster_end in clusters:
+            if offset < cluster_start:
+                pieces.append(self._normalize(string[offset:cluster_start]))
+                starts.extend(range(offset, cluster_start))
+                ends.extend(range(offset, cluster_start))
+                positions[offset:cluster_start] = array("q", range(size, size + cluster_start - offset))
+                size += cluster_start - offset
+            segment_start = cluster_start
+            for i in range(cluster_start + 1, cluster_end + 1):
+                if i < cluster_end and i not in forced and not starters[string[i]]:
+                    continue
+                normalized = self._normalize(string[segment_start:i])
+                positions[segment_start] = size
+                length = len(normalized)
+                if length:
+                    pieces.append(normalized)
+                    starts.append(segment_start)
+                    starts.extend([-1] * (length - 1))
+                    ends.extend([-1] * (length - 1))
+                    ends.append(i - 1)
+                    size += length
+                segment_start = i
+            offset = cluster_end
+        if offset < n:
+            pieces.append(self._normalize(string[offset:]))
+            starts.extend(range(offset, n))
+            ends.extend(range(offset, n))
+            positions[offset:n] = array("q", range(size, size + n - offset))
+            size += n - offset
+        positions[n] = size
+        return "".join(pieces), starts, ends, positions
+
+
+def _reject_objects(data: bytes) -> Any:
+    # Passed to ahocorasick.load, which calls it only for automata storing Python objects.
+    raise ValueError("Saved automata must store integers.")
+
+
+@lru_cache(maxsize=None)
+def _get_normalizer(form: Optional[str], casefold: bool) -> _Normalizer:
+    # Matchers with the same options share a normalizer and its per-character tables.
+    return _Normalizer(form, casefold)
+
+
+# Normalized forms of one text by normalizer, shared by matchers within a single call.
+_MappedTexts = Dict[_Normalizer, Tuple[str, Sequence[int], Sequence[int], Sequence[int]]]
+
+
+def _map_text(
+    normalizer: _Normalizer, text: StringSequence, mapped: Optional[_MappedTexts]
+) -> Tuple[str, Sequence[int], Sequence[int], Sequence[int]]:
+    if mapped is None:
+        return normalizer.map_text(text)
+    result = mapped.get(normalizer)
+    if result is None:
+        result = mapped[normalizer] = normalizer.map_text(text)
+    return result
+
 
 class DictionaryMatcher(Matcher):
-    """Dictionary-based matching."""
+    """Dictionary-based matching.
+
+    DictionaryMatcher.add and DictionaryMatcher.remove change the automaton in place, so
+    they must not run while other threads are matching. DictionaryMatcher.update applies
+    changes to a copy of the current automaton, which replaces it once built, so matching
+    never waits for an update and always sees a complete automaton. The copy costs time
+    and memory: while it is built, the old automaton, its pickled bytes and the copy are
+    held at once, about three times the memory of the automaton.
+
+    The automaton stores an integer per pattern, an index of a distinct combination of a
+    label, a length and a score, instead of a Python object per pattern.
 
-    def __init__(self) -> None:
-        self._automaton = Automaton()
+    Args:
+      token_boundary: If True, matches in TokenizedText are checked against token boundaries
+        by index lookups instead of TokenizedText.validate_offsets, which is faster when many
+        matches do not align with tokens. Results are the same.
+      normalization: A Unicode normalization form, "NFC", "NFKC", "NFD" or "NFKD", applied to
+        both patterns and texts before matching. Offsets of entities still point to original
+        texts. A match covering only part of a character expanded by normalization is dropped.
+      casefold: If True, patterns and texts are matched case-insensitively by str.casefold.
+      vocab: LabelVocab interning labels. EntityBatch returned by match_entity_batch uses it,
+        so label IDs are shared with other components using the same vocabulary. A new
+        vocabulary is created by default.
+    """
+
+    def __init__(
+        self,
+        token_boundary: bool = False,
+        normalization: Optional[str] = None,
+        casefold: bool = False,
+        vocab: Optional[LabelVocab] = None,
+    ) -> None:
+        self._token_boundary = token_boundary
+        self._normalization = normalization
+        self._casefold = casefold
+        self._normalizer = _get_normalizer(normalization, casefold) if normalization or casefold else None
+        self._vocab = vocab if vocab is not None else LabelVocab()
+        # Payloads of the automaton index this list, which only grows, so an automaton never
+        # refers to a missing payload even while it is replaced.
+        self._payloads: List[Tuple[str, int, float, int]] = []
+        self._payload_ids: Dict[Tuple[str, int, float], int] = {}
+        self._max_length = 0
+        self._automaton = Automaton(STORE_INTS)
+        self._update_lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor: Optional["ThreadPoolExecutor"] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_update_lock"]
+        del state["_executor_lock"]
+        del state["_executor"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._normalizer is not None:
+            self._normalizer = _get_normalizer(self._normalization, self._casefold)
+        self._update_lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor = None
 
     def add(self, patterns: Dict) -> None:
-        """Adds entity match-rules to DictionaryMatcher.
+        """Adds entity match-rules to DictionaryMatcher in place.
 
         Args:
-          patterns: A dictionary mapping string sequences to the corresponding labels.
+          patterns: A dictionary mapping string sequences to the corresponding labels, or to
+            tuples of a label and a score given to matched entities.
         """
-        automaton = self._automaton
-        for string, label in patterns.items():
-            automaton.add_word(string, (label, len(string)))
-        automaton.make_automaton()
+        self._update(patterns, (), copy=False)
+
+    def remove(self, strings: Iterable[str]) -> None:
+        """Removes entity match-rules from DictionaryMatcher in place.
+
+        Args:
+          strings: An iterable of string sequences to remove.
+        """
+        self._update({}, strings, copy=False)
+
+    def update(self, patterns: Optional[Dict] = None, removals: Optional[Iterable[str]] = None) -> "Future":
+        """Adds and removes entity match-rules in a background thread.
+
+        Matching keeps using the current automaton until the updated one, built on a copy,
+        is ready. Updates are applied one at a time in the order they are requested.
+
+        Args:
+          patterns: A dictionary mapping string sequences to the corresponding labels to add,
+            or to tuples of a label and a score.
+          removals: An iterable of string sequences to remove.
+
+        Returns:
+          A future which is done when the updated automaton is in use.
+        """
+        with self._executor_lock:
+            # Created on first use, so importing and building matchers does not load concurrent.futures.
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor.submit(self._update, dict(patterns or {}), list(removals or ()), True)
+
+    @property
+    def vocab(self) -> LabelVocab:
+        """LabelVocab interning labels of patterns."""
+        return self._vocab
+
+    def _payload_id(self, label: str, length: int, score: float) -> int:
+        key = (label, length, score)
+        payload_id = self._payload_ids.get(key)
+        if payload_id is None:
+            payload_id = self._payload_ids[key] = len(self._payloads)
+            self._payloads.append((label, length, score, self._vocab.label_id(label)))
+            self._max_length = max(self._max_length, length)
+        return payload_id
+
+    @property
+    def max_length(self) -> int:
+        """The length of the longest pattern ever added, after normalization.
+
+        Removed patterns are still counted, so it is an upper bound of current patterns.
+        """
+        return self._max_length
+
+    def _update(self, patterns: Dict, removals: Iterable[str], copy: bool) -> None:
+        normalizer = self._normalizer
+        if normalizer is not None:
+            patterns = {normalizer(string): value for string, value in patterns.items()}
+            removals = [normalizer(string) for string in removals]
+        with self._update_lock:
+            if not copy:
+                automaton = self._automaton
+            elif len(self._automaton):
+                automaton = pickle.loads(pickle.dumps(self._automaton))
+            else:
+                automaton = Automaton(STORE_INTS)
+            for string in removals:
+                automaton.remove_word(string)
+            for string, value in patterns.items():
+                label, score = value if isinstance(value, tuple) else (value, 1.0)
+                automaton.add_word(string, self._payload_id(label, len(string), score))
+            automaton.make_automaton()
+            self._automaton = automaton
+            # Increased after the swap, so a result computed for the new version never uses the old automaton.
+            self._version += 1
+
+    def save(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Saves the built automaton to a file, and labels and normalization options next to it.
+
+        The automaton is written in the native format of pyahocorasick, and labels, scores
+        and options are written as JSON to the same path with ".json" appended.
+
+        Args:
+          path: A path to a file to save the automaton to.
+        """
+        path = os.fspath(path)
+        metadata = {
+            "options": self._saved_options(),
+            "payloads": [(label, length, score) for label, length, score, _ in self._payloads],
+        }
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        self._automaton.save(path)
+
+    def _saved_options(self) -> Dict[str, Any]:
+        # Options that saved patterns depend on, which must be the same when they are loaded.
+        return {"normalization": self._normalization, "casefold": self._casefold}
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, "os.PathLike[str]"],
+        token_boundary: bool = False,
+        normalization: Optional[str] = None,
+        casefold: bool = False,
+        vocab: Optional[LabelVocab] = None,
+    ) -> "DictionaryMatcher":
+        """Loads DictionaryMatcher saved by DictionaryMatcher.save.
+
+        The automaton is restored as it was built, so patterns are neither added nor
+        compiled again. Saved patterns are already normalized, so normalization and casefold
+        must be the same as those of the saved matcher. Files are read as JSON and as an
+        automaton storing integers, so loading them never runs code.
+
+        Args:
+          path: A path to a file saved by DictionaryMatcher.save. Its ".json" file must be next to it.
+          token_boundary: See DictionaryMatcher.
+          normalization: See DictionaryMatcher.
+          casefold: See DictionaryMatcher.
+          vocab: See DictionaryMatcher. Saved labels are interned to it.
+
+        Returns:
+          DictionaryMatcher with the saved patterns.
+
+        Raises:
+          ValueError: If normalization or casefold differs from that of the saved matcher, or
+            if the automaton stores other values than integers.
+        """
+        path = os.fspath(path)
+        matcher = cls(token_boundary, normalization, casefold, vocab)
+        with open(path + ".json", encoding="utf-8") as f:
+            metadata = json.load(f)
+        if metadata["options"] != matcher._saved_options():
+            raise ValueError(f"Options differ from those of patterns saved in {path}: {metadata['options']}")
+        for label, length, score in metadata["payloads"]:
+            matcher._payload_id(label, length, score)
+        matcher._automaton = load(path, _reject_objects)
+        return matcher
 
     def match(self, text: StringSequence) -> List[Entity]:
         """Finds all sequences matching the supplied patterns.
@@ -44,10 +531,770 @@ class DictionaryMatcher(Matcher):
         Returns:
           A list of entities describing matches.
         """
+        return self._match(text)[0]
+
+    def _match(self, text: StringSequence, mapped: Optional[_MappedTexts] = None) -> Tuple[List[Entity], int]:
+        if self._normalizer is not None:
+            matches, rejected = self._match_normalized(text, mapped)
+            return [Entity(*match) for match in matches], rejected
+        if self._token_boundary and isinstance(text, TokenizedText):
+            token_starts, token_ends = text.token_offsets()
+            matches = self._match_tokens(str(text), token_starts, token_ends, token_starts, token_ends)
+            return [Entity(*match) for match in matches], 0
+
         entities = []
-        for end_offset, (label, length) in self._automaton.iter(str(text)):
+        rejected = 0
+        payloads = self._payloads
+        for end_offset, payload_id in self._automaton.iter(str(text)):
+            label, length, score, _ = payloads[payload_id]
+            start_offset = end_offset - length + 1
+            if not text.validate_offsets(start_offset, end_offset):
+                rejected += 1
+                continue
+            entities.append(Entity(start_offset, end_offset, label, score))
+        return entities, rejected
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        """Finds all sequences matching the supplied patterns lazily.
+
+        Entities are yielded in end-offset order as the automaton finds them, so no list of
+        all matches is built. With token_boundary, matches of TokenizedText are collected
+        first to be ordered.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          An iterator of entities in the same order as DictionaryMatcher.match.
+        """
+        if self._token_boundary and isinstance(text, TokenizedText):
+            yield from self.match(text)
+            return
+
+        automaton = self._automaton
+        payloads = self._payloads
+        validate_offsets = text.validate_offsets
+        if self._normalizer is None:
+            for end_offset, payload_id in automaton.iter(str(text)):
+                label, length, score, _ = payloads[payload_id]
+                start_offset = end_offset - length + 1
+                if validate_offsets(start_offset, end_offset):
+                    yield Entity(start_offset, end_offset, label, score)
+            return
+
+        string, starts, ends, _ = self._normalizer.map_text(text)
+        for end, payload_id in automaton.iter(string):
+            label, length, score, _ = payloads[payload_id]
+            start_offset = starts[end - length + 1]
+            end_offset = ends[end]
+            if start_offset >= 0 and end_offset >= 0 and validate_offsets(start_offset, end_offset):
+                yield Entity(start_offset, end_offset, label, score)
+
+    def iter_match_chunks(self, chunks: Iterable[str]) -> Iterator[Entity]:
+        """Finds all sequences matching the supplied patterns in a document given in chunks.
+
+        Chunks are consecutive pieces of one document, e.g. blocks read from a file, and are
+        matched as Text of their concatenation without building it. Each window holds a chunk
+        and the last max_length - 1 characters before it, so patterns across chunks are found
+        and matches ending in the overlap are skipped as already reported. With normalization,
+        a character which may combine with the next chunk is held until it arrives. Memory use
+        is bounded by the chunk size, and entities are yielded in the same order as
+        DictionaryMatcher.iter_match, so LongestMatchFilter(max_length=matcher.max_length) can
+        filter them window by window.
+
+        Args:
+          chunks: An iterable of strings forming a document.
+
+        Returns:
+          An iterator of entities with offsets in the whole document.
+        """
+        normalizer = self._normalizer
+        pending = ""
+        # The document offset of pending and the number of its normalized characters already scanned.
+        base = 0
+        scanned = 0
+        for chunk in itertools.chain(chunks, [None]):
+            if chunk is None:
+                window, rest = pending, ""
+            elif not chunk:
+                continue
+            else:
+                window = pending + chunk
+                if normalizer is not None:
+                    stable_length = normalizer.stable_length(window)
+                    window, rest = window[:stable_length], window[stable_length:]
+                else:
+                    rest = ""
+
+            # Patterns may be added while matching, so the overlap is taken per window.
+            automaton = self._automaton
+            payloads = self._payloads
+            overlap = max(self._max_length - 1, 0)
+            string: str = window
+            starts: Sequence[int] = range(len(window))
+            ends: Sequence[int] = starts
+            if normalizer is not None:
+                string, starts, ends, _ = normalizer.map(window)
+            for end, payload_id in automaton.iter(string):
+                if end < scanned:
+                    continue
+                label, length, score, _ = payloads[payload_id]
+                start_offset = starts[end - length + 1]
+                end_offset = ends[end]
+                if start_offset >= 0 and end_offset >= 0:
+                    yield Entity(base + start_offset, base + end_offset, label, score)
+
+            # Keeps at least overlap normalized characters, starting at the start of a segment.
+            tail = max(len(string) - overlap, 0)
+            while 0 < tail < len(string) and starts[tail] < 0:
+                tail -= 1
+            cut = starts[tail] if tail < len(string) else len(window)
+            pending = window[cut:] + rest
+            base += cut
+            scanned = len(string) - tail
+
+    def match_entity_batch(self, text: StringSequence) -> EntityBatch:
+        """Finds all sequences matching the supplied patterns as EntityBatch.
+
+        No Entity object is created.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          EntityBatch describing matches in the same order as DictionaryMatcher.match.
+        """
+        return self._match_entity_batch(text)[0]
+
+    def _match_entity_batch(
+        self, text: StringSequence, mapped: Optional[_MappedTexts] = None
+    ) -> Tuple[EntityBatch, int]:
+        batch = EntityBatch(vocab=self._vocab)
+        append = batch.append
+        if self._normalizer is not None:
+            matches, rejected = self._match_normalized(text, mapped)
+            for match in matches:
+                append(*match)
+            return batch, rejected
+        if self._token_boundary and isinstance(text, TokenizedText):
+            token_starts, token_ends = text.token_offsets()
+            for match in self._match_tokens(str(text), token_starts, token_ends, token_starts, token_ends):
+                append(*match)
+            return batch, 0
+
+        # Columns are filled directly with label IDs interned when patterns were added.
+        rejected = 0
+        payloads = self._payloads
+        start_offsets = batch.start_offsets
+        end_offsets = batch.end_offsets
+        label_ids = batch.label_ids
+        scores = batch.scores
+        for end_offset, payload_id in self._automaton.iter(str(text)):
+            _, length, score, label_id = payloads[payload_id]
             start_offset = end_offset - length + 1
             if not text.validate_offsets(start_offset, end_offset):
+                rejected += 1
+                continue
+            start_offsets.append(start_offset)
+            end_offsets.append(end_offset)
+            label_ids.append(label_id)
+            scores.append(score)
+        return batch, rejected
+
+    def _match_normalized(
+        self, text: StringSequence, mapped: Optional[_MappedTexts]
+    ) -> Tuple[List[Tuple[int, int, str, float]], int]:
+        assert self._normalizer is not None
+        string, starts, ends, positions = _map_text(self._normalizer, text, mapped)
+        if not (self._token_boundary and isinstance(text, TokenizedText)):
+            return self._match_string(text, string, starts, ends)
+        token_starts, token_ends = text.token_offsets()
+        key_starts = [positions[start_offset] for start_offset in token_starts]
+        key_ends = [positions[end_offset + 1] - 1 for end_offset in token_ends]
+        return self._match_tokens(string, key_starts, key_ends, token_starts, token_ends), 0
+
+    def _match_string(
+        self, text: StringSequence, string: str, starts: Sequence[int], ends: Sequence[int]
+    ) -> Tuple[List[Tuple[int, int, str, float]], int]:
+        matches = []
+        rejected = 0
+        payloads = self._payloads
+        for end, payload_id in self._automaton.iter(string):
+            label, length, score, _ = payloads[payload_id]
+            start_offset = starts[end - length + 1]
+            end_offset = ends[end]
+            if start_offset < 0 or end_offset < 0 or not text.validate_offsets(start_offset, end_offset):
+                rejected += 1
                 continue
-            entities.append(Entity(start_offset, end_offset, label))
-        return entities
+            matches.append((start_offset, end_offset, label, score))
+        return matches, rejected
+
+    def _match_tokens(
+        self,
+        string: str,
+        key_starts: Sequence[int],
+        key_ends: Sequence[int],
+        token_starts: Sequence[int],
+        token_ends: Sequence[int],
+    ) -> List[Tuple[int, int, str, float]]:
+        # Matches come by end offset, then from the longest one, which is the order of entities.
+        found = list(self._automaton.iter(string))
+        payloads = self._payloads
+        matches = []
+        n = len(key_starts)
+        if len(found) < n:
+            # Few matches: each one is looked up among the boundaries.
+            for end, payload_id in found:
+                j = bisect_left(key_ends, end)
+                if j == n or key_ends[j] != end:
+                    continue
+                label, length, score, _ = payloads[payload_id]
+                start = end - length + 1
+                i = bisect_left(key_starts, start)
+                if i < n and key_starts[i] == start:
+                    matches.append((token_starts[i], token_ends[j], label, score))
+            return matches
+
+        # Many matches: offsets of string at token boundaries are mapped to offsets of a text
+        # once, and others to -1, so each match is checked by two list lookups.
+        start_offsets = [-1] * (len(string) + 1)
+        for key_start, start_offset in zip(key_starts, token_starts):
+            start_offsets[key_start] = start_offset
+        end_offsets = [-1] * (len(string) + 1)
+        for key_end, end_offset in zip(key_ends, token_ends):
+            end_offsets[key_end] = end_offset
+        for end, payload_id in found:
+            end_offset = end_offsets[end]
+            if end_offset < 0:
+                continue
+            label, length, score, _ = payloads[payload_id]
+            start_offset = start_offsets[end - length + 1]
+            if start_offset >= 0:
+                matches.append((start_offset, end_offset, label, score))
+        return matches
+
+
+class RegexMatcher(Matcher):
+    """Regular expression-based matching.
+
+    All patterns are compiled into one alternation of named groups, so a text is scanned
+    once however many patterns are added. Like re.finditer, matches do not overlap and the
+    first pattern added wins among ones matching at the same position. Empty matches and
+    matches not aligning with tokens of TokenizedText are dropped.
+
+    Patterns should not use numbered backreferences or global inline flags, because they
+    are combined into one expression. Use named groups and flags instead.
+
+    Args:
+      flags: Flags of the re module applied to all patterns, e.g. re.IGNORECASE.
+      overlapped: If True, matches starting inside other matches are also found. It requires
+        the regex module, which is installed by pip install regex.
+    """
+
+    def __init__(self, flags: int = 0, overlapped: bool = False) -> None:
+        if overlapped:
+            require("regex", "overlapped matching")
+        self._flags = flags
+        self._overlapped = overlapped
+        self._patterns: Dict[str, Tuple[str, float]] = {}
+        self._compiled: Optional[Tuple[Any, Dict[str, Tuple[str, float]]]] = None
+
+    def add(self, patterns: Dict) -> None:
+        """Adds entity match-rules to RegexMatcher.
+
+        Args:
+          patterns: A dictionary mapping regular expressions to the corresponding labels, or to
+            tuples of a label and a score given to matched entities.
+        """
+        merged = dict(self._patterns)
+        for pattern, value in patterns.items():
+            merged[pattern] = value if isinstance(value, tuple) else (value, 1.0)
+        alternatives = []
+        values = {}
+        for i, (pattern, value) in enumerate(merged.items()):
+            name = f"_seqlabel{i}"
+            alternatives.append(f"(?P<{name}>{pattern})")
+            values[name] = value
+        expression = "|".join(alternatives)
+        if self._overlapped:
+            compiled = require("regex", "overlapped matching").compile(expression, self._flags)
+        else:
+            compiled = re.compile(expression, self._flags)
+        self._patterns = merged
+        # Replaced at once, so matching in other threads sees either the old or the new patterns.
+        self._compiled = (compiled, values)
+        self._version += 1
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        """Finds all sequences matching the supplied patterns.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          A list of entities describing matches, ordered by end offset and then by start offset.
+        """
+        return self._match(text)[0]
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        """Finds all sequences matching the supplied patterns lazily.
+
+        Matches do not overlap unless overlapped is True, so they are yielded as they are
+        found. Overlapped matches are collected first to be ordered.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          An iterator of entities in the same order as RegexMatcher.match.
+        """
+        if self._overlapped:
+            yield from self.match(text)
+            return
+        for entity in self._iter_candidates(text):
+            if entity is not None:
+                yield entity
+
+    def _iter_candidates(self, text: StringSequence) -> Iterator[Optional[Entity]]:
+        # Yields None for a match rejected for not aligning with items.
+        if self._compiled is None:
+            return
+        compiled, values = self._compiled
+        if self._overlapped:
+            matches = compiled.finditer(str(text), overlapped=True)
+        else:
+            matches = compiled.finditer(str(text))
+        validate_offsets = text.validate_offsets
+        for match in matches:
+            start_offset, end = match.span()
+            if start_offset == end:
+                continue
+            if not validate_offsets(start_offset, end - 1):
+                yield None
+                continue
+            label, score = values[match.lastgroup]
+            yield Entity(start_offset, end - 1, label, score)
+
+    def _match(self, text: StringSequence) -> Tuple[List[Entity], int]:
+        entities = []
+        rejected = 0
+        for entity in self._iter_candidates(text):
+            if entity is None:
+                rejected += 1
+            else:
+                entities.append(entity)
+        if self._overlapped:
+            # Follows the order of DictionaryMatcher: by end offset, then from the longest match.
+            entities.sort(key=_entity_order)
+        return entities, rejected
+
+    def _match_entity_batch(self, text: StringSequence) -> Tuple[EntityBatch, int]:
+        entities, rejected = self._match(text)
+        return EntityBatch.from_entities(entities), rejected
+
+
+def _entity_order(entity: Entity) -> Tuple[int, int]:
+    return entity.end_offset, entity.start_offset
+
+
+def _sorted(items: List[Any], key: Callable[[Any], Tuple[int, int]]) -> List[Any]:
+    # Returns items ordered by key, sorting only if they are not in order yet.
+    keys = [key(item) for item in items]
+    if all(a <= b for a, b in zip(keys, keys[1:])):
+        return items
+    return sorted(items, key=key)
+
+
+def _thread_pool(max_workers: int) -> Optional["ThreadPoolExecutor"]:
+    # concurrent.futures is only imported when threads are used.
+    if max_workers < 2:
+        return None
+    from concurrent.futures import ThreadPoolExecutor
+
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+class CompositeMatcher(Matcher):
+    """Matcher running several matchers over the same text and merging their results.
+
+    Entities of all matchers are merged into one list ordered by end offset and then by start
+    offset, which is the order of DictionaryMatcher and RegexMatcher. Results already in this
+    order are merged without sorting again. Texts cache their string and token offsets, and
+    DictionaryMatchers with the same normalization share the normalized form of a text
+    within a call of CompositeMatcher.match, so a text is prepared once for all matchers.
+
+    Args:
+      matchers: A list of matchers to run.
+      max_workers: The number of threads running matchers. Threads only help matchers
+        releasing the GIL, so matchers run one after another by default.
+      add_to: The index of the matcher which CompositeMatcher.add passes patterns to.
+    """
+
+    def __init__(self, matchers: List[Matcher], max_workers: int = 1, add_to: int = 0) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be a positive integer.")
+        if not -len(matchers) <= add_to < len(matchers):
+            raise ValueError("add_to must be an index of matchers.")
+        self._matchers = list(matchers)
+        self._max_workers = max_workers
+        self._add_to = add_to
+        self._executor = _thread_pool(max_workers)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_executor"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._executor = _thread_pool(self._max_workers)
+
+    @property
+    def matchers(self) -> List[Matcher]:
+        """A list of matchers to run."""
+        return self._matchers
+
+    @property
+    def version(self) -> int:
+        """The sum of versions of matchers, which increases whenever any of them changes."""
+        return sum(matcher.version for matcher in self._matchers)
+
+    def add(self, patterns: Dict) -> None:
+        """Adds entity match-rules to the matcher chosen by add_to.
+
+        Args:
+          patterns: Patterns in the form accepted by the matcher.
+        """
+        self._matchers[self._add_to].add(patterns)
+
+    def _run(self, method: str, text: StringSequence) -> List[Any]:
+        # The normalized forms live only as long as this call, so no text is kept after matching.
+        mapped: _MappedTexts = {}
+        calls = []
+        for matcher in self._matchers:
+            func = getattr(matcher, method)
+            calls.append(partial(func, text, mapped) if isinstance(matcher, DictionaryMatcher) else partial(func, text))
+        if self._executor is None or len(calls) < 2:
+            return [call() for call in calls]
+        futures = [self._executor.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        """Finds all sequences matching patterns of any matcher.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          A list of entities ordered by end offset and then by start offset.
+        """
+        return self._match(text)[0]
+
+    def match_entity_batch(self, text: StringSequence) -> EntityBatch:
+        """Finds all sequences matching patterns of any matcher as EntityBatch.
+
+        Batches of matchers are merged without creating Entity objects. If all of them share
+        a vocabulary, so does the merged batch.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          EntityBatch describing matches in the same order as CompositeMatcher.match.
+        """
+        return self._match_entity_batch(text)[0]
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        """Finds all sequences matching patterns of any matcher lazily.
+
+        Entities yielded by iter_match of each matcher are merged as they come, so they must
+        be ordered by end offset and then by start offset. Matchers run in turn regardless
+        of max_workers.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          An iterator of entities in the same order as CompositeMatcher.match.
+        """
+        yield from merge(*(matcher.iter_match(text) for matcher in self._matchers), key=_entity_order)
+
+    def _match(self, text: StringSequence) -> Tuple[List[Entity], int]:
+        results = self._run("_match", text)
+        rejected = sum(count for _, count in results)
+        lists = [_sorted(entities, _entity_order) for entities, _ in results]
+        if len(lists) == 1:
+            return lists[0], rejected
+        return list(merge(*lists, key=_entity_order)), rejected
+
+    def _match_entity_batch(self, text: StringSequence) -> Tuple[EntityBatch, int]:
+        results = self._run("_match_entity_batch", text)
+        rejected = sum(count for _, count in results)
+        lists = []
+        for batch, _ in results:
+            labels = batch.labels
+            columns = zip(batch.end_offsets, batch.start_offsets, batch.label_ids, batch.scores)
+            spans = [(end, start, labels[label_id], score) for end, start, label_id, score in columns]
+            lists.append(_sorted(spans, itemgetter(0, 1)))
+        # Matchers sharing a vocabulary keep it, so serializers using it still look tags up by label ID.
+        vocabs = {id(batch.vocab): batch.vocab for batch, _ in results}
+        merged = EntityBatch(vocab=vocabs.popitem()[1]) if len(vocabs) == 1 else EntityBatch()
+        append = merged.append
+        for end_offset, start_offset, label, score in merge(*lists, key=itemgetter(0, 1)):
+            append(start_offset, end_offset, label, score)
+        return merged, rejected
+
+
+class ShardedDictionaryMatcher(Matcher):
+    """Dictionary-based matching over patterns split into shards stored in a directory.
+
+    Each shard is a DictionaryMatcher saved to its own file, and only a few shards are kept
+    in memory: a shard is loaded when a text needs it, and the least recently used shard is
+    evicted once more than max_loaded_shards are loaded. Results of shards are merged into
+    one list ordered by end offset and then by start offset, as DictionaryMatcher does.
+
+    With shard_by="prefix", patterns are split by a hash of their first character, and only
+    shards of characters appearing in a text are queried, so short texts touch few shards.
+    With shard_by="label", patterns are split by label and every shard is queried. A string
+    added with several labels then matches with all of them.
+
+    A directory keeps an index of shards and their options, so a matcher created again for
+    the same directory reopens the stored shards.
+
+    Args:
+      directory: A directory storing shards. It is created if it does not exist.
+      shard_by: "prefix" or "label".
+      n_shards: The number of shards for shard_by="prefix".
+      max_loaded_shards: The maximum number of shards kept in memory.
+      token_boundary: See DictionaryMatcher.
+      normalization: See DictionaryMatcher.
+      casefold: See DictionaryMatcher.
+      vocab: See DictionaryMatcher. It is shared by all shards.
+    """
+
+    index_name = "index.json"
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        shard_by: str = "prefix",
+        n_shards: int = 16,
+        max_loaded_shards: int = 4,
+        token_boundary: bool = False,
+        normalization: Optional[str] = None,
+        casefold: bool = False,
+        vocab: Optional[LabelVocab] = None,
+    ) -> None:
+        if shard_by not in ("prefix", "label"):
+            raise ValueError(f"Unknown shard_by: {shard_by}")
+        if n_shards < 1 or max_loaded_shards < 1:
+            raise ValueError("n_shards and max_loaded_shards must be positive integers.")
+        self._directory = os.fspath(directory)
+        self._options: Dict[str, Any] = {
+            "shard_by": shard_by,
+            "n_shards": n_shards,
+            "normalization": normalization,
+            "casefold": casefold,
+        }
+        self._max_loaded_shards = max_loaded_shards
+        self._token_boundary = token_boundary
+        self._normalizer = _get_normalizer(normalization, casefold) if normalization or casefold else None
+        self._vocab = vocab if vocab is not None else LabelVocab()
+        # Shard keys mapped to their file name, the number of patterns, loads and queries.
+        self._shards: Dict[str, Dict[str, Any]] = {}
+        self._loaded: "OrderedDict[str, DictionaryMatcher]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(self._directory, exist_ok=True)
+        index_path = os.path.join(self._directory, self.index_name)
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            if index["options"] != self._options:
+                raise ValueError(f"Options differ from those of shards in {self._directory}: {index['options']}")
+            self._shards = {
+                key: {"file": shard["file"], "patterns": shard["patterns"], "loads": 0, "queries": 0}
+                for key, shard in index["shards"].items()
+            }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_loaded"] = OrderedDict()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self._normalizer is not None:
+            self._normalizer = _get_normalizer(self._options["normalization"], self._options["casefold"])
+        self._lock = threading.Lock()
+
+    def _prefix_key(self, char: str) -> str:
+        return str(zlib.crc32(char.encode("utf-8")) % self._options["n_shards"])
+
+    def _shard_key(self, string: str, label: str) -> str:
+        if self._options["shard_by"] == "label":
+            return label
+        if self._normalizer is not None:
+            string = self._normalizer(string)
+        return self._prefix_key(string[:1])
+
+    def _new_shard(self) -> DictionaryMatcher:
+        return DictionaryMatcher(
+            self._token_boundary, self._options["normalization"], self._options["casefold"], self._vocab
+        )
+
+    def _get_shard(self, key: str) -> DictionaryMatcher:
+        with self._lock:
+            shard = self._loaded.get(key)
+            if shard is not None:
+                self._loaded.move_to_end(key)
+                return shard
+            info = self._shards[key]
+            shard = DictionaryMatcher.load(
+                os.path.join(self._directory, info["file"]),
+                self._token_boundary,
+                self._options["normalization"],
+                self._options["casefold"],
+                self._vocab,
+            )
+            info["loads"] += 1
+            self._keep(key, shard)
+            return shard
+
+    def _keep(self, key: str, shard: DictionaryMatcher) -> None:
+        # Marks a shard as the most recently used one and evicts the least recently used ones.
+        self._loaded[key] = shard
+        self._loaded.move_to_end(key)
+        while len(self._loaded) > self._max_loaded_shards:
+            self._loaded.popitem(last=False)
+
+    def _write_index(self) -> None:
+        index = {
+            "options": self._options,
+            "shards": {key: {"file": info["file"], "patterns": info["patterns"]} for key, info in self._shards.items()},
+        }
+        path = os.path.join(self._directory, self.index_name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def _update_shards(self, updates: Dict[str, Tuple[Dict, List[str]]]) -> None:
+        for key, (patterns, removals) in updates.items():
+            if key in self._shards:
+                shard = self._get_shard(key)
+            elif patterns:
+                shard = self._new_shard()
+                self._shards[key] = {"file": f"shard-{len(self._shards):05d}.automaton", "loads": 0, "queries": 0}
+            else:
+                continue
+            # Loaded shards may be matched by other threads, so they are updated on a copy.
+            shard._update(patterns, removals, copy=True)
+            shard.save(os.path.join(self._directory, self._shards[key]["file"]))
+            self._shards[key]["patterns"] = len(shard._automaton)
+            with self._lock:
+                self._keep(key, shard)
+        self._write_index()
+        self._version += 1
+
+    def add(self, patterns: Dict) -> None:
+        """Adds entity match-rules to their shards and saves the shards.
+
+        Args:
+          patterns: A dictionary mapping string sequences to the corresponding labels, or to
+            tuples of a label and a score given to matched entities.
+        """
+        updates: Dict[str, Tuple[Dict, List[str]]] = {}
+        for string, value in patterns.items():
+            label = value[0] if isinstance(value, tuple) else value
+            updates.setdefault(self._shard_key(string, label), ({}, []))[0][string] = value
+        self._update_shards(updates)
+
+    def remove(self, strings: Iterable[str]) -> None:
+        """Removes entity match-rules from their shards and saves the shards.
+
+        Args:
+          strings: An iterable of string sequences to remove.
+        """
+        strings = list(strings)
+        updates: Dict[str, Tuple[Dict, List[str]]] = {}
+        if self._options["shard_by"] == "label":
+            # A string may be stored with any label, so it is removed from every shard.
+            updates = {key: ({}, strings) for key in self._shards}
+        else:
+            for string in strings:
+                updates.setdefault(self._shard_key(string, ""), ({}, []))[1].append(string)
+        self._update_shards(updates)
+
+    def _query_keys(self, text: StringSequence, mapped: Optional[_MappedTexts] = None) -> List[str]:
+        if self._options["shard_by"] == "label":
+            return list(self._shards)
+        string = _map_text(self._normalizer, text, mapped)[0] if self._normalizer is not None else str(text)
+        keys = {self._prefix_key(char) for char in set(string)}
+        return [key for key in self._shards if key in keys]
+
+    def _query(self, text: StringSequence, mapped: Optional[_MappedTexts] = None) -> Iterator[DictionaryMatcher]:
+        # Shards are loaded one by one, so a shard evicted after use can be freed before the next one.
+        for key in self._query_keys(text, mapped):
+            self._shards[key]["queries"] += 1
+            yield self._get_shard(key)
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        """Finds all sequences matching patterns of any shard.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          A list of entities ordered by end offset and then by start offset.
+        """
+        return self._match(text)[0]
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        """Finds all sequences matching patterns of any shard lazily.
+
+        All queried shards are kept until the iterator is exhausted.
+
+        Args:
+          text: A text to match over.
+
+        Returns:
+          An iterator of entities in the same order as ShardedDictionaryMatcher.match.
+        """
+        yield from merge(*(shard.iter_match(text) for shard in self._query(text)), key=_entity_order)
+
+    def _match(self, text: StringSequence) -> Tuple[List[Entity], int]:
+        # Shards share a normalizer, so a text is normalized once for all of them.
+        mapped: _MappedTexts = {}
+        results = [shard._match(text, mapped) for shard in self._query(text, mapped)]
+        rejected = sum(count for _, count in results)
+        if len(results) == 1:
+            return results[0][0], rejected
+        return list(merge(*(entities for entities, _ in results), key=_entity_order)), rejected
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns statistics of each shard.
+
+        Returns:
+          A dictionary mapping shard keys, a hash of first characters or a label, to
+          statistics: "file" and "file_bytes" of a saved shard including its labels, the
+          number of "patterns", whether it is "loaded", "memory_bytes" of a loaded automaton
+          or 0 otherwise, and the number of "loads" from the file and "queries" since the
+          matcher was created.
+        """
+        with self._lock:
+            loaded = dict(self._loaded)
+            stats = {}
+            for key, info in self._shards.items():
+                shard = loaded.get(key)
+                path = os.path.join(self._directory, info["file"])
+                stats[key] = {
+                    "file": info["file"],
+                    "file_bytes": os.path.getsize(path) + os.path.getsize(path + ".json"),
+                    "patterns": info["patterns"],
+                    "loaded": shard is not None,
+                    "memory_bytes": shard._automaton.get_stats()["total_size"] if shard is not None else 0,
+                    "loads": info["loads"],
+                    "queries": info["queries"],
+                }
+        return stats
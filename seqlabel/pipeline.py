@@ -0,0 +1,145 @@
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, Iterable, Iterator, List, Optional
+
+from .cache import CacheInfo, LRUCache, text_key
+from .core import StringSequence
+from .entity_filters import EntityFilter
+from .matchers import Matcher
+from .serializers import Serializer
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+_worker_pipeline: Optional["Pipeline"] = None
+
+
+def _init_worker(pipeline: "Pipeline") -> None:
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def _process_chunk(texts: List[StringSequence]) -> List[str]:
+    pipeline = _worker_pipeline
+    if pipeline is None:
+        raise RuntimeError("Worker process is not initialized.")
+    return [pipeline(text) for text in texts]
+
+
+def _chunked(texts: Iterable[StringSequence], chunk_size: int) -> Iterator[List[StringSequence]]:
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Pipeline:
+    """A labeling pipeline running matching, filtering and serialization in order.
+
+    Args:
+      matcher: A matcher finding entities in a text.
+      entity_filter: An entity filter removing unwanted entities.
+      serializer: A serializer converting a text and entities to a string.
+      lazy: If True, entities are streamed from Matcher.iter_match through EntityFilter.iter_filter
+        to the serializer instead of being built as lists, which reduces peak memory for long texts.
+      cache_size: The maximum number of serialized strings cached for repeated texts. Results
+        are keyed by the content of a text and the version of the matcher, so changing patterns
+        invalidates them. Each worker process of Pipeline.pipe has its own cache. No cache is
+        used by default.
+    """
+
+    def __init__(
+        self,
+        matcher: Matcher,
+        entity_filter: EntityFilter,
+        serializer: Serializer,
+        lazy: bool = False,
+        cache_size: int = 0,
+    ) -> None:
+        if cache_size < 0:
+            raise ValueError("cache_size must be a non-negative integer.")
+        self._matcher = matcher
+        self._entity_filter = entity_filter
+        self._serializer = serializer
+        self._lazy = lazy
+        self._cache: Optional[LRUCache[str]] = LRUCache(cache_size) if cache_size else None
+
+    def __call__(self, text: StringSequence) -> str:
+        """Labels a text.
+
+        Args:
+          text: A text to label.
+
+        Returns:
+          A serialized string.
+        """
+        if self._cache is None:
+            return self._label(text)
+        content = text_key(text)
+        if content is None:
+            return self._label(text)
+        key = (content, self._matcher.version)
+        string = self._cache.get(key)
+        if string is None:
+            string = self._label(text)
+            self._cache.put(key, string)
+        return string
+
+    def _label(self, text: StringSequence) -> str:
+        if self._lazy:
+            return self._serializer.save(text, self._entity_filter.iter_filter(self._matcher.iter_match(text)))
+        entities = self._entity_filter(self._matcher.match(text))
+        return self._serializer.save(text, entities)
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        """Returns hits, misses, maxsize and the current size of the cache, or None without a cache."""
+        return self._cache.info() if self._cache is not None else None
+
+    def pipe(self, texts: Iterable[StringSequence], n_process: int = 1, chunk_size: int = 1000) -> Iterator[str]:
+        """Labels texts, optionally across multiple worker processes.
+
+        Workers receive the pipeline once at start-up, so the automaton is shared rather than
+        sent with every task. On platforms supporting fork, it is inherited without pickling.
+        Results are yielded in input order as soon as each chunk is done, and only a bounded
+        number of chunks are in flight at a time.
+
+        Args:
+          texts: An iterable of texts to label.
+          n_process: The number of worker processes. -1 means the number of CPUs.
+          chunk_size: The number of texts sent to a worker at once.
+
+        Returns:
+          An iterator of serialized strings.
+        """
+        # Imported here, so processes labeling texts one by one never load multiprocessing.
+        import multiprocessing
+
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        if n_process == -1:
+            n_process = multiprocessing.cpu_count()
+        if n_process < 1:
+            raise ValueError("n_process must be a positive integer or -1.")
+
+        if n_process == 1:
+            for text in texts:
+                yield self(text)
+            return
+
+        context: "BaseContext"
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context()
+
+        max_pending = 2 * n_process
+        with context.Pool(n_process, initializer=_init_worker, initargs=(self,)) as pool:
+            pending: Deque = deque()
+            for chunk in _chunked(texts, chunk_size):
+                pending.append(pool.apply_async(_process_chunk, (chunk,)))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
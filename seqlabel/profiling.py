@@ -0,0 +1,269 @@
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .backends import require
+from .core import Entity, EntityBatch, StringSequence
+from .entity_filters import EntityFilter
+from .matchers import Matcher
+from .serializers import Serializer
+
+Callback = Callable[[str, float, Dict[str, int]], None]
+
+
+class Profiler:
+    """Collects per-stage timing and counters of profiled components.
+
+    Components are profiled by wrapping them with Profiler.matcher, Profiler.entity_filter
+    and Profiler.serializer. Unwrapped components are not instrumented at all, so profiling
+    costs nothing when it is not used. Stages are "match", "filter" and "serialize". Each
+    stage records calls and seconds, and the following counters:
+
+    - match: "entities" found and "rejected_alignments", candidates dropped because they do
+      not align with items of a text.
+    - filter: "candidates" given and "entities" left.
+    - serialize: "entities" serialized.
+
+    Stats are collected in the process running the components, so ones recorded in worker
+    processes of Pipeline.pipe are not included.
+
+    Args:
+      callbacks: Functions called with a stage name, seconds and counters on every call,
+        e.g. PrometheusCallback.
+    """
+
+    def __init__(self, callbacks: Iterable[Callback] = ()) -> None:
+        self._callbacks = list(callbacks)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """A snapshot of "calls", "seconds" and counters by stage."""
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._stats.items()}
+
+    def reset(self) -> None:
+        """Clears collected stats."""
+        with self._lock:
+            self._stats.clear()
+
+    def record(self, stage: str, seconds: float, counts: Dict[str, int]) -> None:
+        """Records a call of a stage and passes it to callbacks.
+
+        Args:
+          stage: A stage name.
+          seconds: Wall time of the call.
+          counts: Counters of the call.
+        """
+        with self._lock:
+            stats = self._stats.setdefault(stage, {"calls": 0, "seconds": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += seconds
+            for name, count in counts.items():
+                stats[name] = stats.get(name, 0) + count
+        for callback in self._callbacks:
+            callback(stage, seconds, counts)
+
+    def matcher(self, matcher: Matcher) -> "ProfiledMatcher":
+        """Wraps a matcher to profile the match stage.
+
+        Args:
+          matcher: A matcher to profile.
+
+        Returns:
+          A matcher recording stats to this profiler.
+        """
+        return ProfiledMatcher(matcher, self)
+
+    def entity_filter(self, entity_filter: EntityFilter) -> "ProfiledEntityFilter":
+        """Wraps an entity filter to profile the filter stage.
+
+        Args:
+          entity_filter: An entity filter to profile.
+
+        Returns:
+          An entity filter recording stats to this profiler.
+        """
+        return ProfiledEntityFilter(entity_filter, self)
+
+    def serializer(self, serializer: Serializer) -> "ProfiledSerializer":
+        """Wraps a serializer to profile the serialize stage.
+
+        Args:
+          serializer: A serializer to profile.
+
+        Returns:
+          A serializer recording stats to this profiler.
+        """
+        return ProfiledSerializer(serializer, self)
+
+
+class _TimedIterator:
+    # Iterates over an iterable, counting items and seconds spent producing them.
+
+    def __init__(self, iterable: Iterable[Entity]) -> None:
+        self._iterator = iter(iterable)
+        self.count = 0
+        self.seconds = 0.0
+
+    def __iter__(self) -> "_TimedIterator":
+        return self
+
+    def __next__(self) -> Entity:
+        start = perf_counter()
+        try:
+            item = next(self._iterator)
+        finally:
+            self.seconds += perf_counter() - start
+        self.count += 1
+        return item
+
+
+class ProfiledMatcher(Matcher):
+    """Matcher recording the match stage to Profiler. Other attributes are delegated.
+
+    Args:
+      matcher: A matcher to profile.
+      profiler: Profiler recording stats.
+    """
+
+    def __init__(self, matcher: Matcher, profiler: Profiler) -> None:
+        self._matcher = matcher
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._matcher, name)
+
+    @property
+    def version(self) -> int:
+        return self._matcher.version
+
+    def add(self, patterns: Dict) -> None:
+        self._matcher.add(patterns)
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        start = perf_counter()
+        entities, rejected = self._matcher._match(text)
+        seconds = perf_counter() - start
+        self._profiler.record("match", seconds, {"entities": len(entities), "rejected_alignments": rejected})
+        return entities
+
+    def match_entity_batch(self, text: StringSequence) -> EntityBatch:
+        start = perf_counter()
+        batch, rejected = self._matcher._match_entity_batch(text)
+        seconds = perf_counter() - start
+        self._profiler.record("match", seconds, {"entities": len(batch), "rejected_alignments": rejected})
+        return batch
+
+    def iter_match(self, text: StringSequence) -> Iterator[Entity]:
+        # Recorded once exhausted. Matchers do not report rejected alignments lazily.
+        entities = _TimedIterator(self._matcher.iter_match(text))
+        yield from entities
+        self._profiler.record("match", entities.seconds, {"entities": entities.count})
+
+
+class ProfiledEntityFilter(EntityFilter):
+    """EntityFilter recording the filter stage to Profiler. Other attributes are delegated.
+
+    Args:
+      entity_filter: An entity filter to profile.
+      profiler: Profiler recording stats.
+    """
+
+    def __init__(self, entity_filter: EntityFilter, profiler: Profiler) -> None:
+        self._entity_filter = entity_filter
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._entity_filter, name)
+
+    def __call__(self, entities: List[Entity]) -> List[Entity]:
+        start = perf_counter()
+        filtered = self._entity_filter(entities)
+        seconds = perf_counter() - start
+        self._profiler.record("filter", seconds, {"candidates": len(entities), "entities": len(filtered)})
+        return filtered
+
+    def filter_entity_batch(self, batch: EntityBatch) -> EntityBatch:
+        start = perf_counter()
+        filtered = self._entity_filter.filter_entity_batch(batch)
+        seconds = perf_counter() - start
+        self._profiler.record("filter", seconds, {"candidates": len(batch), "entities": len(filtered)})
+        return filtered
+
+    def iter_filter(self, entities: Iterable[Entity]) -> Iterator[Entity]:
+        # Recorded once exhausted. Seconds spent producing candidates belong to upstream stages.
+        candidates = _TimedIterator(entities)
+        filtered = _TimedIterator(self._entity_filter.iter_filter(candidates))
+        yield from filtered
+        seconds = filtered.seconds - candidates.seconds
+        self._profiler.record("filter", seconds, {"candidates": candidates.count, "entities": filtered.count})
+
+
+class ProfiledSerializer(Serializer):
+    """Serializer recording the serialize stage to Profiler. Other attributes are delegated.
+
+    Args:
+      serializer: A serializer to profile.
+      profiler: Profiler recording stats.
+    """
+
+    def __init__(self, serializer: Serializer, profiler: Profiler) -> None:
+        self._serializer = serializer
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._serializer, name)
+
+    def save(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> str:
+        # Iterators are consumed beforehand, so lazy upstream stages are not timed as serialization.
+        sized = entities if isinstance(entities, (list, EntityBatch)) else list(entities)
+        start = perf_counter()
+        string = self._serializer.save(text, sized)
+        seconds = perf_counter() - start
+        self._profiler.record("serialize", seconds, {"entities": len(sized)})
+        return string
+
+
+class PrometheusCallback:
+    """Profiler callback exporting stats as Prometheus counters.
+
+    It requires prometheus_client. Counters are labeled by stage:
+    <namespace>_stage_calls_total, <namespace>_stage_seconds_total and
+    <namespace>_stage_items_total, which is also labeled by counter name.
+
+    Args:
+      namespace: A prefix of metric names.
+      registry: A registry of metrics. The default registry of prometheus_client is used by default.
+    """
+
+    def __init__(self, namespace: str = "seqlabel", registry: Optional[Any] = None) -> None:
+        prometheus_client = require("prometheus_client", "PrometheusCallback", "prometheus-client")
+        kwargs: Dict[str, Any] = {"namespace": namespace}
+        if registry is not None:
+            kwargs["registry"] = registry
+        self._calls = prometheus_client.Counter("stage_calls", "Calls of a stage.", ["stage"], **kwargs)
+        self._seconds = prometheus_client.Counter("stage_seconds", "Seconds spent in a stage.", ["stage"], **kwargs)
+        self._items = prometheus_client.Counter("stage_items", "Items counted in a stage.", ["stage", "name"], **kwargs)
+
+    def __call__(self, stage: str, seconds: float, counts: Dict[str, int]) -> None:
+        self._calls.labels(stage).inc()
+        self._seconds.labels(stage).inc(seconds)
+        for name, count in counts.items():
+            self._items.labels(stage, name).inc(count)
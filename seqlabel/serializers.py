@@ -1,141 +1,278 @@
 import json
+import threading
 from abc import abstractmethod
-from typing import List
+from array import array
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from .core import Entity, StringSequence
+from .backends import is_available, require
+from .core import Entity, EntityBatch, LabelVocab, StringSequence, Text, TokenizedText
+
+Document = Tuple[StringSequence, Union[Iterable[Entity], EntityBatch]]
+
+
+def _spans(entities: Union[Iterable[Entity], EntityBatch]) -> Iterator[Tuple[int, int, str]]:
+    if isinstance(entities, EntityBatch):
+        return entities.spans()
+    return ((entity.start_offset, entity.end_offset, entity.label) for entity in entities)
 
 
 class Serializer:
     """Base class of all serializers."""
 
     @abstractmethod
-    def save(self, text: StringSequence, entities: List[Entity]) -> str:
+    def save(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> str:
         pass
 
 
-class JSONLSerializer(Serializer):
-    """JSON format Serializer."""
+def _orjson_dumps(obj: Any) -> str:
+    return require("orjson", "the orjson backend").dumps(obj).decode()
+
+
+_compact_json_dumps = partial(json.dumps, ensure_ascii=False, separators=(",", ":"))
 
-    def save(self, text: StringSequence, entities: List[Entity]) -> str:
+
+class JSONLSerializer(Serializer):
+    """JSON format Serializer.
+
+    Args:
+      compact: If True, Text is stored once as a string and TokenizedText as tokens with
+        space_after, instead of a list of items.
+      backend: A JSON encoder, "json", "orjson" or "auto". "orjson" and "auto" write UTF-8
+        JSON without spaces. "auto" uses orjson if it is installed and json otherwise, with
+        the same output.
+    """
+
+    def __init__(self, compact: bool = False, backend: str = "json") -> None:
+        if backend not in ("json", "orjson", "auto"):
+            raise ValueError(f"Unknown backend: {backend}")
+        if backend == "orjson":
+            require("orjson", "the orjson backend")
+
+        self._compact = compact
+        self._use_orjson = backend != "json" and is_available("orjson")
+        self._dumps: Callable[[Any], str]
+        if self._use_orjson:
+            self._dumps = _orjson_dumps
+        elif backend == "json":
+            self._dumps = json.dumps
+        else:
+            self._dumps = _compact_json_dumps
+
+    def _to_dict(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> Dict[str, Any]:
+        tags = []
+        for start_offset, end_offset, label in _spans(entities):
+            start_offset, end_offset = text.align_offsets(start_offset, end_offset)
+            tags.append({"start_offset": start_offset, "end_offset": end_offset, "label": label})
+        if not self._compact:
+            return {"text": list(text), "tags": tags}
+        if isinstance(text, Text):
+            return {"text": str(text), "tags": tags}
+        if isinstance(text, TokenizedText):
+            return {"text": text.tokens, "space_after": text.space_after, "tags": tags}
+        return {"text": list(text), "tags": tags}
+
+    def save(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> str:
         """Converts a text and entities as JSONL format.
 
         Args:
           text: A text.
-          entities: A list of entities appeared in a given text.
+          entities: An iterable of entities or EntityBatch appeared in a given text.
 
         Returns:
           A JSON format string.
         """
-        tags = []
-        for entity in entities:
-            start_offset, end_offset = text.align_offsets(entity.start_offset, entity.end_offset)
-            tags.append({"start_offset": start_offset, "end_offset": end_offset, "label": entity.label})
-        return json.dumps(
-            {
-                "text": list(text),
-                "tags": tags,
-            }
-        )
+        return self._dumps(self._to_dict(text, entities))
 
-
-class IOB2Serializer(Serializer):
-    """IOB2 format Serializer."""
-
-    def save(self, text: StringSequence, entities: List[Entity]) -> str:
-        """Converts a text and entities as IOB2 format.
+    def save_many(self, documents: Iterable[Document]) -> str:
+        """Converts many texts and entities as JSONL format at once.
 
         Args:
-          text: A text.
-          entities: A list of entities appeared in a given text.
+          documents: An iterable of tuples of a text and entities.
 
         Returns:
-          A IOB2 format string.
+          A JSONL format string with one document per line.
         """
-        sequence = list(text)
-        n = len(sequence)
-        tags = ["O"] * n
-        for entity in entities:
-            start, end = text.align_offsets(entity.start_offset, entity.end_offset)
-
-            if any(tag != "O" for tag in tags[start : end + 1]):
+        to_dict = self._to_dict
+        if self._use_orjson:
+            orjson_dumps = require("orjson", "the orjson backend").dumps
+            return b"\n".join([orjson_dumps(to_dict(text, entities)) for text, entities in documents]).decode()
+        dumps = self._dumps
+        return "\n".join([dumps(to_dict(text, entities)) for text, entities in documents])
+
+
+class TaggingSerializer(Serializer):
+    """Base class of serializers assigning a tag to each item of a text.
+
+    Subclasses define a tagging scheme by prefixes of tags at the beginning, inside and
+    the last of an entity and of a single-item entity. Tag strings are built once per label.
+
+    Args:
+      labels: A list of labels registered in advance. It fixes tag IDs returned by encode.
+        Other labels are registered when they first appear.
+      vocab: LabelVocab whose label IDs order tags, so serializers sharing a vocabulary
+        return the same tag IDs. Labels of EntityBatch using it are looked up by label ID.
+        New labels are added to it.
+    """
+
+    begin_prefix: str
+    inside_prefix: str
+    last_prefix: str
+    unit_prefix: str
+
+    def __init__(self, labels: Optional[List[str]] = None, vocab: Optional[LabelVocab] = None) -> None:
+        self._prefixes = list(
+            dict.fromkeys((self.begin_prefix, self.inside_prefix, self.last_prefix, self.unit_prefix))
+        )
+        self._vocab = vocab
+        self._tag_vocab = ["O"]
+        self._tag_strings: Dict[str, Tuple[str, str, str, str]] = {}
+        self._tag_ids: Dict[str, Tuple[int, int, int, int]] = {}
+        # Tags indexed by label IDs of vocab, filled in order of label IDs.
+        self._tag_strings_by_id: List[Tuple[str, str, str, str]] = []
+        self._tag_ids_by_id: List[Tuple[int, int, int, int]] = []
+        self._lock = threading.Lock()
+        for label in labels or ():
+            self._register(label)
+        self._sync()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def tag_vocab(self) -> List[str]:
+        """A list of tag strings indexed by tag IDs."""
+        return self._tag_vocab
+
+    def _register(self, label: str) -> None:
+        if self._vocab is None:
+            with self._lock:
+                if label not in self._tag_strings:
+                    self._add_tags(label)
+            return
+        self._vocab.label_id(label)
+        self._sync()
+
+    def _sync(self) -> None:
+        # Adds tags of labels new to vocab in order of their IDs.
+        if self._vocab is None or len(self._tag_strings_by_id) == len(self._vocab):
+            return
+        with self._lock:
+            labels = self._vocab.labels
+            for label_id in range(len(self._tag_strings_by_id), len(labels)):
+                label = labels[label_id]
+                self._add_tags(label)
+                self._tag_strings_by_id.append(self._tag_strings[label])
+                self._tag_ids_by_id.append(self._tag_ids[label])
+
+    def _add_tags(self, label: str) -> None:
+        ids = {}
+        for prefix in self._prefixes:
+            ids[prefix] = len(self._tag_vocab)
+            self._tag_vocab.append(f"{prefix}-{label}")
+        begin, inside, last, unit = self.begin_prefix, self.inside_prefix, self.last_prefix, self.unit_prefix
+        self._tag_ids[label] = (ids[begin], ids[inside], ids[last], ids[unit])
+        self._tag_strings[label] = (f"{begin}-{label}", f"{inside}-{label}", f"{last}-{label}", f"{unit}-{label}")
+
+    def _fill(
+        self,
+        tags: List[Any],
+        text: StringSequence,
+        entities: Union[Iterable[Entity], EntityBatch],
+        table: Dict,
+        table_by_id: List,
+    ) -> None:
+        spans: Iterable[Tuple[int, int, Any]]
+        lookup: Any
+        by_id = False
+        if isinstance(entities, EntityBatch) and self._vocab is not None and entities.vocab is self._vocab:
+            self._sync()
+            spans = zip(entities.start_offsets, entities.end_offsets, entities.label_ids)
+            lookup = table_by_id
+            by_id = True
+        else:
+            spans = _spans(entities)
+            lookup = table
+
+        occupied = bytearray(len(tags))
+        for start_offset, end_offset, key in spans:
+            start, end = text.align_offsets(start_offset, end_offset)
+
+            if occupied.find(1, start, end + 1) != -1:
                 raise ValueError("Overlapping spans are found.")
+            occupied[start : end + 1] = b"\x01" * (end - start + 1)
 
-            tags[start] = f"B-{entity.label}"
+            if not by_id and key not in table:
+                self._register(key)
+            begin, inside, last, unit = lookup[key]
             if start == end:
+                tags[start] = unit
                 continue
-            tags[start + 1 : end + 1] = [f"I-{entity.label}"] * (end - start)
+            tags[start] = begin
+            tags[start + 1 : end] = [inside] * (end - start - 1)
+            tags[end] = last
 
-        result = []
-        for item, tag in zip(sequence, tags):
-            result.append(f"{item}\t{tag}")
-        return "\n".join(result)
+    def save(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> str:
+        """Converts a text and entities as a tagging format.
 
+        Args:
+          text: A text.
+          entities: An iterable of entities or EntityBatch appeared in a given text.
 
-class IOBESSerializer(Serializer):
-    """IOBES format Serializer."""
+        Returns:
+          A tagging format string with an item and a tag separated by a tab on each line.
+        """
+        sequence = list(text)
+        tags = ["O"] * len(sequence)
+        self._fill(tags, text, entities, self._tag_strings, self._tag_strings_by_id)
+        return "\n".join(map("\t".join, zip(sequence, tags)))
 
-    def save(self, text: StringSequence, entities: List[Entity]) -> str:
-        """Converts a text and entities as IOBES format.
+    def encode(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> "array[int]":
+        """Converts a text and entities to tag IDs without building tag strings.
+
+        Tag IDs index tag_vocab. The result can be viewed as a NumPy array without a copy
+        by ``numpy.frombuffer(ids, dtype=numpy.int32)``.
 
         Args:
           text: A text.
-          entities: A list of entities appeared in a given text.
+          entities: An iterable of entities or EntityBatch appeared in a given text.
 
         Returns:
-          A IOBES format string.
+          An array of tag IDs for each item of a text.
         """
-        sequence = list(text)
-        n = len(sequence)
-        tags = ["O"] * n
-        for entity in entities:
-            start, end = text.align_offsets(entity.start_offset, entity.end_offset)
+        tags = [0] * len(text)
+        self._fill(tags, text, entities, self._tag_ids, self._tag_ids_by_id)
+        return array("i", tags)
 
-            if any(tag != "O" for tag in tags[start : end + 1]):
-                raise ValueError("Overlapping spans are found.")
 
-            if start == end:
-                tags[start] = f"S-{entity.label}"
-                continue
-            tags[start] = f"B-{entity.label}"
-            tags[start + 1 : end] = [f"I-{entity.label}"] * (end - start - 1)
-            tags[end] = f"E-{entity.label}"
-
-        result = []
-        for item, tag in zip(sequence, tags):
-            result.append(f"{item}\t{tag}")
-        return "\n".join(result)
+class IOB2Serializer(TaggingSerializer):
+    """IOB2 format Serializer."""
 
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "I"
+    unit_prefix = "B"
 
-class BILOUSerializer(Serializer):
-    """BILOU format Serializer."""
 
-    def save(self, text: StringSequence, entities: List[Entity]) -> str:
-        """Converts a text and entities as BILOU format.
+class IOBESSerializer(TaggingSerializer):
+    """IOBES format Serializer."""
 
-        Args:
-          text: A text.
-          entities: A list of entities appeared in a given text.
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "E"
+    unit_prefix = "S"
 
-        Returns:
-          A BILOU format string.
-        """
-        sequence = list(text)
-        n = len(sequence)
-        tags = ["O"] * n
-        for entity in entities:
-            start, end = text.align_offsets(entity.start_offset, entity.end_offset)
 
-            if any(tag != "O" for tag in tags[start : end + 1]):
-                raise ValueError("Overlapping spans are found.")
+class BILOUSerializer(TaggingSerializer):
+    """BILOU format Serializer."""
 
-            if start == end:
-                tags[start] = f"U-{entity.label}"
-                continue
-            tags[start] = f"B-{entity.label}"
-            tags[start + 1 : end] = [f"I-{entity.label}"] * (end - start - 1)
-            tags[end] = f"L-{entity.label}"
-
-        result = []
-        for item, tag in zip(sequence, tags):
-            result.append(f"{item}\t{tag}")
-        return "\n".join(result)
+    begin_prefix = "B"
+    inside_prefix = "I"
+    last_prefix = "L"
+    unit_prefix = "U"
@@ -0,0 +1,151 @@
+import os
+from types import TracebackType
+from typing import IO, Iterable, List, Optional, Type, Union
+
+from .core import Entity, EntityBatch, StringSequence
+from .files import PathLike, open_text
+from .serializers import Document, IOB2Serializer, JSONLSerializer, Serializer, TaggingSerializer
+
+
+class CorpusWriter:
+    """Base class of all corpus writers.
+
+    It serializes documents one by one and writes them to a file in large chunks, so memory
+    usage does not depend on the size of a corpus.
+
+    Args:
+      file: A path or a file object opened in text mode.
+      serializer: A serializer converting a text and entities to a string.
+      separator: A string written between documents.
+      compression: "gzip", "zstd" or None. If None, it is inferred from the suffix of a path.
+        It is available only for a path.
+      buffer_size: The number of characters buffered before writing to a file.
+    """
+
+    def __init__(
+        self,
+        file: Union[PathLike, IO[str]],
+        serializer: Serializer,
+        separator: str,
+        compression: Optional[str] = None,
+        buffer_size: int = 1 << 20,
+    ) -> None:
+        if isinstance(file, (str, os.PathLike)):
+            self._file = open_text(file, "w", compression)
+            self._should_close = True
+        elif compression is not None:
+            raise ValueError("compression is available only for a path.")
+        else:
+            self._file = file
+            self._should_close = False
+        self._serializer = serializer
+        self._separator = separator
+        self._buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._count = 0
+        self._closed = False
+
+    def write(self, text: StringSequence, entities: Union[Iterable[Entity], EntityBatch]) -> None:
+        """Serializes and writes a document.
+
+        Args:
+          text: A text.
+          entities: An iterable of entities or EntityBatch appeared in a given text.
+        """
+        string = self._serializer.save(text, entities)
+        if self._count:
+            self._buffer.append(self._separator)
+        self._buffer.append(string)
+        self._count += 1
+        self._buffered += len(string)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def write_all(self, documents: Iterable[Document]) -> int:
+        """Serializes and writes documents.
+
+        Args:
+          documents: An iterable of tuples of a text and entities.
+
+        Returns:
+          The number of documents written.
+        """
+        count = 0
+        for text, entities in documents:
+            self.write(text, entities)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Writes buffered documents to a file."""
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+        self._file.flush()
+
+    def close(self) -> None:
+        """Writes buffered documents and closes a file opened by the writer.
+
+        Calls after the first one do nothing.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._count:
+            self._buffer.append("\n")
+        self.flush()
+        if self._should_close:
+            self._file.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+
+class JSONLWriter(CorpusWriter):
+    """JSONL format writer writing one document per line.
+
+    Args:
+      file: A path or a file object opened in text mode.
+      serializer: A JSONL serializer. JSONLSerializer() is used by default.
+      compression: "gzip", "zstd" or None. If None, it is inferred from the suffix of a path.
+      buffer_size: The number of characters buffered before writing to a file.
+    """
+
+    def __init__(
+        self,
+        file: Union[PathLike, IO[str]],
+        serializer: Optional[JSONLSerializer] = None,
+        compression: Optional[str] = None,
+        buffer_size: int = 1 << 20,
+    ) -> None:
+        super().__init__(file, serializer or JSONLSerializer(), "\n", compression, buffer_size)
+
+
+class CoNLLWriter(CorpusWriter):
+    """CoNLL format writer separating documents by a blank line.
+
+    Args:
+      file: A path or a file object opened in text mode.
+      serializer: A tagging serializer. IOB2Serializer() is used by default.
+      compression: "gzip", "zstd" or None. If None, it is inferred from the suffix of a path.
+      buffer_size: The number of characters buffered before writing to a file.
+    """
+
+    def __init__(
+        self,
+        file: Union[PathLike, IO[str]],
+        serializer: Optional[TaggingSerializer] = None,
+        compression: Optional[str] = None,
+        buffer_size: int = 1 << 20,
+    ) -> None:
+        super().__init__(file, serializer or IOB2Serializer(), "\n\n", compression, buffer_size)
@@ -0,0 +1,100 @@
+import asyncio
+from typing import List
+
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+
+import seqlabel.aio
+from seqlabel.aio import AsyncLabeler
+from seqlabel.core import StringSequence, Text
+from seqlabel.entity_filters import LongestMatchFilter
+from seqlabel.matchers import DictionaryMatcher
+from seqlabel.pipeline import Pipeline
+from seqlabel.serializers import IOB2Serializer
+
+
+@pytest.fixture
+def pipeline() -> Pipeline:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    return Pipeline(matcher, LongestMatchFilter(), IOB2Serializer())
+
+
+@pytest.fixture
+def texts(text_ja: StringSequence, tokenized_text_ja: StringSequence) -> List[StringSequence]:
+    return [text_ja, tokenized_text_ja, Text("京都と東京"), Text("大阪")] * 5
+
+
+@pytest.mark.parametrize("max_batch_size,max_delay", [(1, 0.0), (4, 0.0), (64, 0.001)])
+def test_async_labeler_label_many(
+    pipeline: Pipeline, texts: List[StringSequence], max_batch_size: int, max_delay: float
+) -> None:
+    async def main() -> List[str]:
+        async with AsyncLabeler(pipeline, max_batch_size=max_batch_size, max_delay=max_delay) as labeler:
+            return await labeler.label_many(texts)
+
+    assert asyncio.run(main()) == [pipeline(text) for text in texts]
+
+
+def test_async_labeler_makes_micro_batches(
+    pipeline: Pipeline, texts: List[StringSequence], monkeypatch: MonkeyPatch
+) -> None:
+    batch_sizes = []
+    label_batch = seqlabel.aio._label_batch
+
+    def recording_label_batch(pipeline: Pipeline, texts: List[StringSequence]) -> list:
+        batch_sizes.append(len(texts))
+        return label_batch(pipeline, texts)
+
+    monkeypatch.setattr(seqlabel.aio, "_label_batch", recording_label_batch)
+
+    async def main() -> List[str]:
+        async with AsyncLabeler(pipeline, max_batch_size=8) as labeler:
+            return await labeler.label_many(texts)
+
+    assert asyncio.run(main()) == [pipeline(text) for text in texts]
+    assert sum(batch_sizes) == len(texts)
+    assert max(batch_sizes) == 8
+
+
+def test_async_labeler_propagates_errors(pipeline: Pipeline, text_ja: StringSequence) -> None:
+    async def main() -> None:
+        async with AsyncLabeler(pipeline) as labeler:
+            results = await asyncio.gather(labeler.label(text_ja), labeler.label(None), return_exceptions=True)  # type: ignore
+            assert results[0] == pipeline(text_ja)
+            assert isinstance(results[1], Exception)
+
+    asyncio.run(main())
+
+
+def test_async_labeler_cancellation_does_not_affect_others(pipeline: Pipeline, text_ja: StringSequence) -> None:
+    async def main() -> None:
+        async with AsyncLabeler(pipeline, max_delay=0.01) as labeler:
+            cancelled = asyncio.ensure_future(labeler.label(text_ja))
+            others = [asyncio.ensure_future(labeler.label(text_ja)) for _ in range(3)]
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            assert await asyncio.gather(*others) == [pipeline(text_ja)] * 3
+            assert cancelled.cancelled()
+
+    asyncio.run(main())
+
+
+def test_async_labeler_close(pipeline: Pipeline, text_ja: StringSequence) -> None:
+    async def main() -> None:
+        labeler = AsyncLabeler(pipeline, max_delay=1.0)
+        waiting = asyncio.ensure_future(labeler.label(text_ja))
+        await asyncio.sleep(0)
+        await labeler.close()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        with pytest.raises(RuntimeError):
+            await labeler.label(text_ja)
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("kwargs", [{"max_workers": 0}, {"max_batch_size": 0}, {"max_pending": 0}])
+def test_async_labeler_raises_value_error(pipeline: Pipeline, kwargs: dict) -> None:
+    with pytest.raises(ValueError):
+        AsyncLabeler(pipeline, **kwargs)
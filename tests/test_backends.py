@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from seqlabel.backends import is_available, require
+
+# Modules importing seqlabel must not load. Backends are optional, and the standard library
+# modules below take longer to import than seqlabel itself.
+LAZY_MODULES = [
+    "orjson",
+    "numpy",
+    "regex",
+    "zstandard",
+    "prometheus_client",
+    "concurrent.futures",
+    "multiprocessing",
+    "dataclasses",
+]
+
+# Importing all modules below takes about 15 ms, or 55 ms when bytecode is not cached. The
+# margin keeps the test from failing on a slow machine rather than on a heavy import.
+IMPORT_BUDGET = 0.15
+
+SCRIPT = """
+import json, sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+import seqlabel, seqlabel.cache, seqlabel.deserializers, seqlabel.entity_filters, seqlabel.matchers
+import seqlabel.pipeline, seqlabel.profiling, seqlabel.serializers, seqlabel.writers
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "modules": sorted(set(sys.modules) - before)}))
+"""
+
+
+def _import_seqlabel() -> dict:
+    output = subprocess.run([sys.executable, "-c", SCRIPT], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def test_is_available() -> None:
+    assert is_available("json")
+    assert not is_available("seqlabel_missing_backend")
+
+
+def test_require() -> None:
+    assert require("json", "tests") is json
+
+
+def test_require_raises_import_error() -> None:
+    with pytest.raises(ImportError, match="pip install seqlabel-missing-backend"):
+        require("seqlabel_missing_backend", "tests", "seqlabel-missing-backend")
+
+
+def test_import_does_not_load_lazy_modules() -> None:
+    modules = _import_seqlabel()["modules"]
+    assert [name for name in LAZY_MODULES if name in modules] == []
+
+
+def test_import_time_budget() -> None:
+    # The best of a few runs, where the first one may also compile bytecode.
+    seconds = min(_import_seqlabel()["seconds"] for _ in range(3))
+    assert seconds < IMPORT_BUDGET
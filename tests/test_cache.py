@@ -0,0 +1,95 @@
+import pickle
+
+import pytest
+
+from seqlabel.cache import CachedMatcher, CacheInfo, LRUCache, text_key
+from seqlabel.core import Entity, StringSequence, Text, TokenizedText
+from seqlabel.matchers import CompositeMatcher, DictionaryMatcher, RegexMatcher
+
+
+@pytest.fixture
+def matcher() -> DictionaryMatcher:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    return matcher
+
+
+def test_text_key_distinguishes_tokenization() -> None:
+    text = Text("東京都")
+    tokenized_text = TokenizedText(["東京", "都"], [False, False])
+    assert text_key(text) == text_key(Text("東京都"))
+    assert text_key(tokenized_text) == text_key(TokenizedText(["東京", "都"], [False, False]))
+    assert text_key(tokenized_text) != text_key(text)
+    assert text_key(tokenized_text) != text_key(TokenizedText(["東", "京都"], [False, False]))
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.info() == CacheInfo(hits=3, misses=1, maxsize=2, currsize=2)
+    cache.clear()
+    assert cache.info() == CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_lru_cache_raises_value_error() -> None:
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+
+def test_cached_matcher_match(
+    matcher: DictionaryMatcher, text_ja: StringSequence, tokenized_text_ja: StringSequence
+) -> None:
+    cached_matcher = CachedMatcher(matcher, maxsize=8)
+    for _ in range(3):
+        assert cached_matcher.match(text_ja) == matcher.match(text_ja)
+        assert cached_matcher.match(tokenized_text_ja) == matcher.match(tokenized_text_ja)
+    assert cached_matcher.cache_info() == CacheInfo(hits=4, misses=2, maxsize=8, currsize=2)
+
+
+def test_cached_matcher_returns_new_list(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    cached_matcher = CachedMatcher(matcher)
+    cached_matcher.match(text_ja).clear()
+    assert cached_matcher.match(text_ja) == matcher.match(text_ja)
+
+
+def test_cached_matcher_invalidates_on_add(matcher: DictionaryMatcher) -> None:
+    cached_matcher = CachedMatcher(matcher)
+    text = Text("大阪と東京")
+    assert cached_matcher.match(text) == [Entity(3, 4, "LOC")]
+    cached_matcher.add({"大阪": "LOC"})
+    assert cached_matcher.match(text) == [Entity(0, 1, "LOC"), Entity(3, 4, "LOC")]
+    # The wrapped matcher is updated directly.
+    matcher.add({"阪": "CHAR"})
+    assert cached_matcher.match(text) == matcher.match(text)
+    assert cached_matcher.cache_info().misses == 3
+
+
+def test_cached_matcher_invalidates_on_update(matcher: DictionaryMatcher) -> None:
+    cached_matcher = CachedMatcher(matcher)
+    text = Text("大阪と東京")
+    cached_matcher.match(text)
+    matcher.update({"大阪": "LOC"}, removals=["東京"]).result()
+    assert cached_matcher.match(text) == [Entity(0, 1, "LOC")]
+
+
+def test_cached_matcher_invalidates_composite_matcher(matcher: DictionaryMatcher) -> None:
+    regex_matcher = RegexMatcher()
+    cached_matcher = CachedMatcher(CompositeMatcher([matcher, regex_matcher]))
+    text = Text("2021年の東京")
+    assert cached_matcher.match(text) == [Entity(6, 7, "LOC")]
+    regex_matcher.add({r"\d+年": "DATE"})
+    assert cached_matcher.match(text) == [Entity(0, 4, "DATE"), Entity(6, 7, "LOC")]
+
+
+def test_cached_matcher_pickle(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    cached_matcher = CachedMatcher(matcher)
+    cached_matcher.match(text_ja)
+    restored = pickle.loads(pickle.dumps(cached_matcher))
+    assert restored.match(text_ja) == matcher.match(text_ja)
+    assert restored.cache_info().hits == 1
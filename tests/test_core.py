@@ -1,6 +1,13 @@
+import pickle
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError
+from typing import List
+
 import pytest
 
-from seqlabel.core import Entity, Text, TokenizedText
+from seqlabel.core import Entity, EntityBatch, LabelVocab, Text, TokenizedText
 
 
 @pytest.mark.parametrize(
@@ -30,7 +37,7 @@ def test_text_align_offsets_raises_value_error(text_ja: Text, start_offset: int,
 
 @pytest.mark.parametrize(
     "start_offset,end_offset,expected",
-    [(6, 8, True), (7, 8, False)],
+    [(6, 8, True), (7, 8, False), (8, 6, False), (-6, 8, False), (6, 12, False)],
 )
 def test_tokenized_text_validate_offsets(
     tokenized_text_ja: TokenizedText, start_offset: int, end_offset: int, expected: bool
@@ -50,7 +57,7 @@ def test_tokenized_text_align_offsets(
 
 @pytest.mark.parametrize(
     "start_offset,end_offset",
-    [(7, 8)],
+    [(7, 8), (-6, 8), (6, 12)],
 )
 def test_tokenized_text_align_offsets_raiaes_value_error(
     tokenized_text_ja: TokenizedText, start_offset: int, end_offset: int
@@ -63,3 +70,97 @@ def test_tokenized_text_align_offsets_raiaes_value_error(
 def test_entity_raises_value_error_with_invalid_offsets(start_offset: int, end_offset: int, label: str) -> None:
     with pytest.raises(ValueError):
         Entity(start_offset, end_offset, label)
+
+
+def test_tokenized_text_token_offsets() -> None:
+    text = TokenizedText(["New", "York", "is", "big", "."], [True, True, True, False, False])
+    token_starts, token_ends = text.token_offsets()
+    assert list(token_starts) == [0, 4, 9, 12, 15]
+    assert list(token_ends) == [2, 7, 10, 14, 15]
+
+
+@pytest.mark.parametrize("tokens,space_after", [(["New", "York"], [True]), (["New", "", "York"], [True, True, False])])
+def test_tokenized_text_raises_value_error(tokens: List[str], space_after: List[bool]) -> None:
+    with pytest.raises(ValueError):
+        TokenizedText(tokens, space_after)
+
+
+def test_tokenized_text_str(tokenized_text_ja: TokenizedText) -> None:
+    assert str(tokenized_text_ja) == "日本の首都は東京都です。"
+    assert str(TokenizedText(["New", "York", "."], [True, False, False])) == "New York."
+
+
+def test_entity_is_immutable() -> None:
+    entity = Entity(6, 8, "LOC")
+    with pytest.raises(FrozenInstanceError):
+        entity.label = "ORG"  # type: ignore
+    assert not hasattr(entity, "__dict__")
+
+
+def test_entity_equality_and_pickle() -> None:
+    entity = Entity(6, 8, "LOC", 0.5)
+    assert entity == Entity(6, 8, "LOC", 0.5)
+    assert entity != Entity(6, 8, "LOC")
+    assert entity != (6, 8, "LOC", 0.5)
+    assert hash(entity) == hash(Entity(6, 8, "LOC", 0.5))
+    assert pickle.loads(pickle.dumps(entity)) == entity
+    assert repr(entity) == "Entity(start_offset=6, end_offset=8, label='LOC', score=0.5)"
+    assert len(entity) == 3
+
+
+def test_entity_batch() -> None:
+    entities = [Entity(0, 1, "LOC"), Entity(3, 4, "MISC", 0.5), Entity(6, 8, "LOC")]
+    batch = EntityBatch.from_entities(entities)
+    assert len(batch) == 3
+    assert list(batch) == entities
+    assert batch[1] == entities[1]
+    assert batch.labels == ["LOC", "MISC"]
+    assert list(batch.label_ids) == [0, 1, 0]
+    assert list(batch.spans()) == [(0, 1, "LOC"), (3, 4, "MISC"), (6, 8, "LOC")]
+    assert list(batch.take([2, 0])) == [entities[2], entities[0]]
+
+
+def test_entity_batch_raises_value_error_with_invalid_offsets() -> None:
+    with pytest.raises(ValueError):
+        EntityBatch().append(5, 3, "LOC")
+
+
+def test_label_vocab() -> None:
+    vocab = LabelVocab(["LOC"])
+    assert vocab.label_id("MISC") == 1
+    assert vocab.label_id("LOC") == 0
+    assert vocab.labels == ["LOC", "MISC"]
+    assert vocab[1] == "MISC"
+    assert "MISC" in vocab and "ORG" not in vocab
+    assert len(vocab) == 2
+
+
+def test_label_vocab_registers_labels_in_threads() -> None:
+    vocab = LabelVocab()
+    labels = [f"L{i}" for i in range(2000)]
+    barrier = threading.Barrier(8)
+
+    def register(offset: int) -> List[int]:
+        barrier.wait()
+        return [vocab.label_id(label) for label in labels[offset:] + labels[:offset]]
+
+    # Threads switch as often as possible to expose races.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(register, range(0, 2000, 250)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert sorted(vocab.labels) == sorted(labels)
+    for offset, label_ids in zip(range(0, 2000, 250), results):
+        assert [vocab[label_id] for label_id in label_ids] == labels[offset:] + labels[:offset]
+
+
+def test_entity_batch_shares_vocab() -> None:
+    vocab = LabelVocab(["MISC"])
+    batch = EntityBatch.from_entities([Entity(0, 1, "LOC"), Entity(3, 4, "MISC")], vocab)
+    assert batch.vocab is vocab
+    assert list(batch.label_ids) == [1, 0]
+    assert batch.take([1]).vocab is vocab
+    assert EntityBatch(["ORG"], vocab).labels == ["MISC", "LOC", "ORG"]
@@ -0,0 +1,128 @@
+import io
+from pathlib import Path
+from typing import List, Tuple, Union
+
+import pytest
+
+from seqlabel.core import Entity, StringSequence, Text, TokenizedText
+from seqlabel.deserializers import BILOUDeserializer, IOB2Deserializer, IOBESDeserializer, JSONLDeserializer
+from seqlabel.serializers import BILOUSerializer, IOB2Serializer, IOBESSerializer, JSONLSerializer, TaggingSerializer
+from seqlabel.writers import CoNLLWriter, JSONLWriter
+
+TaggingDeserializers = Union[IOB2Deserializer, IOBESDeserializer, BILOUDeserializer]
+
+
+@pytest.fixture
+def entities() -> List[Entity]:
+    return [Entity(0, 1, "LOC"), Entity(2, 2, "MISC"), Entity(6, 8, "LOC")]
+
+
+@pytest.mark.parametrize(
+    "serializer,deserializer",
+    [
+        (IOB2Serializer(), IOB2Deserializer()),
+        (IOBESSerializer(), IOBESDeserializer()),
+        (BILOUSerializer(), BILOUDeserializer()),
+    ],
+)
+def test_tagging_deserializer_load(
+    text_ja: StringSequence,
+    tokenized_text_ja: StringSequence,
+    entities: List[Entity],
+    serializer: TaggingSerializer,
+    deserializer: TaggingDeserializers,
+) -> None:
+    for text in (text_ja, tokenized_text_ja):
+        string = serializer.save(text, entities)
+        loaded_text, loaded_entities = deserializer.load(string)
+        assert isinstance(loaded_text, TokenizedText)
+        assert str(loaded_text) == str(text_ja)
+        assert loaded_entities == entities
+        assert serializer.save(loaded_text, loaded_entities) == string
+
+
+def test_tagging_deserializer_load_text(text_ja: StringSequence, entities: List[Entity]) -> None:
+    loaded_text, loaded_entities = IOB2Deserializer(tokenized=False).load(IOB2Serializer().save(text_ja, entities))
+    assert isinstance(loaded_text, Text)
+    assert str(loaded_text) == str(text_ja)
+    assert loaded_entities == entities
+
+
+@pytest.mark.parametrize(
+    "deserializer,tags,expected",
+    [
+        (IOB2Deserializer(errors="repair"), ["I-LOC", "I-LOC", "O"], [(0, 1, "LOC")]),
+        (IOB2Deserializer(errors="ignore"), ["I-LOC", "I-LOC", "O"], []),
+        (IOB2Deserializer(errors="repair"), ["B-LOC", "I-ORG", "O"], [(0, 0, "LOC"), (1, 1, "ORG")]),
+        (IOB2Deserializer(errors="ignore"), ["B-LOC", "I-ORG", "O"], [(0, 0, "LOC")]),
+        (IOBESDeserializer(errors="repair"), ["B-LOC", "I-LOC", "O"], [(0, 1, "LOC")]),
+        (IOBESDeserializer(errors="ignore"), ["B-LOC", "I-LOC", "O"], []),
+        (
+            IOBESDeserializer(errors="repair"),
+            ["B-LOC", "S-ORG", "E-LOC"],
+            [(0, 0, "LOC"), (1, 1, "ORG"), (2, 2, "LOC")],
+        ),
+        (IOBESDeserializer(errors="ignore"), ["B-LOC", "S-ORG", "E-LOC"], [(1, 1, "ORG")]),
+        (BILOUDeserializer(errors="repair"), ["O", "B-LOC", "I-LOC"], [(1, 2, "LOC")]),
+        (BILOUDeserializer(errors="ignore"), ["X-LOC", "U-LOC", "L-LOC"], [(1, 1, "LOC")]),
+    ],
+)
+def test_tagging_deserializer_malformed_tags(
+    deserializer: TaggingDeserializers, tags: List[str], expected: List[Tuple[int, int, str]]
+) -> None:
+    string = "\n".join(f"{item}\t{tag}" for item, tag in zip("abc", tags))
+    _, entities = deserializer.load(string)
+    assert entities == [Entity(*span) for span in expected]
+
+
+@pytest.mark.parametrize(
+    "deserializer,tags",
+    [
+        (IOB2Deserializer(), ["I-LOC", "O"]),
+        (IOBESDeserializer(), ["B-LOC", "O"]),
+        (BILOUDeserializer(), ["L-LOC", "O"]),
+        (BILOUDeserializer(), ["LOC", "O"]),
+    ],
+)
+def test_tagging_deserializer_raises_value_error_with_malformed_tags(
+    deserializer: TaggingDeserializers, tags: List[str]
+) -> None:
+    with pytest.raises(ValueError):
+        deserializer.load("\n".join(f"{item}\t{tag}" for item, tag in zip("ab", tags)))
+
+
+@pytest.mark.parametrize("filename", ["corpus.conll", "corpus.conll.gz"])
+def test_tagging_deserializer_iter_load(
+    text_ja: StringSequence, entities: List[Entity], tmp_path: Path, filename: str
+) -> None:
+    documents = [(text_ja, entities), (Text("京都"), [Entity(0, 1, "LOC")]), (Text("大阪"), [])]
+    path = tmp_path / filename
+    with CoNLLWriter(path, IOBESSerializer()) as writer:
+        writer.write_all(documents)
+    loaded = list(IOBESDeserializer(tokenized=False).iter_load(path))
+    assert [(str(text), entities) for text, entities in loaded] == [
+        (str(text), entities) for text, entities in documents
+    ]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("tokenized", [False, True])
+def test_jsonl_deserializer_iter_load(
+    text_ja: StringSequence, tokenized_text_ja: StringSequence, entities: List[Entity], compact: bool, tokenized: bool
+) -> None:
+    file = io.StringIO()
+    english = TokenizedText(["New", "York", "."], [True, False, False])
+    documents = [(text_ja, entities), (tokenized_text_ja, entities), (english, [Entity(0, 7, "LOC")])]
+    with JSONLWriter(file, JSONLSerializer(compact=compact)) as writer:
+        writer.write_all(documents)
+    file.seek(0)
+
+    loaded = list(JSONLDeserializer(tokenized=tokenized).iter_load(file))
+    assert [entities for _, entities in loaded[:2]] == [entities, entities]
+    assert [str(text) for text, _ in loaded[:2]] == [str(text_ja)] * 2
+    if compact:
+        assert str(loaded[2][0]) == "New York."
+        assert loaded[2][1] == [Entity(0, 7, "LOC")]
+    else:
+        assert str(loaded[2][0]) == "NewYork."
+        assert loaded[2][1] == [Entity(0, 6, "LOC")]
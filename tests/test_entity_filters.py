@@ -1,9 +1,10 @@
-from typing import List
+import random
+from typing import Callable, List, Optional
 
 import pytest
 
-from seqlabel.core import Entity
-from seqlabel.entity_filters import LongestMatchFilter, MaximizedMatchFilter, overlap
+from seqlabel.core import Entity, EntityBatch
+from seqlabel.entity_filters import EntityFilter, LongestMatchFilter, MaximizedMatchFilter, WeightedMatchFilter, overlap
 
 
 @pytest.fixture
@@ -54,3 +55,137 @@ def test_maximized_match_filter(
     maximized_match_filter: MaximizedMatchFilter, entities: List[Entity], expected: List[Entity]
 ) -> None:
     assert maximized_match_filter(entities) == expected
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_longest_match_filter_matches_pairwise_overlap_check(
+    longest_match_filter: LongestMatchFilter, seed: int
+) -> None:
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(200):
+        start_offset = rng.randrange(100)
+        entities.append(Entity(start_offset, start_offset + rng.randrange(8), rng.choice(["LOC", "ORG"])))
+
+    expected: List[Entity] = []
+    for cur in sorted(entities, key=len, reverse=True):
+        if all(not overlap(cur, prev) for prev in expected):
+            expected.append(cur)
+    expected.sort(key=lambda entity: entity.start_offset)
+
+    assert longest_match_filter(entities) == expected
+
+
+def test_longest_match_filter_empty(longest_match_filter: LongestMatchFilter) -> None:
+    assert longest_match_filter([]) == []
+
+
+@pytest.mark.parametrize(
+    "entities,weight,expected",
+    [
+        (
+            [Entity(0, 3, "LOC"), Entity(2, 7, "LOC"), Entity(6, 8, "LOC")],
+            None,
+            [Entity(0, 3, "LOC"), Entity(6, 8, "LOC")],
+        ),
+        (
+            [Entity(0, 3, "LOC", 0.5), Entity(2, 7, "ORG", 2.0), Entity(6, 8, "LOC", 1.0)],
+            None,
+            [Entity(2, 7, "ORG", 2.0)],
+        ),
+        (
+            [Entity(0, 3, "LOC"), Entity(2, 7, "ORG"), Entity(6, 8, "LOC")],
+            lambda entity: {"LOC": 1.0, "ORG": 3.0}[entity.label],
+            [Entity(2, 7, "ORG")],
+        ),
+        ([Entity(0, 5, "LOC"), Entity(0, 5, "ORG")], None, [Entity(0, 5, "LOC")]),
+        ([], None, []),
+    ],
+)
+def test_weighted_match_filter(
+    entities: List[Entity], weight: Optional[Callable[[Entity], float]], expected: List[Entity]
+) -> None:
+    assert WeightedMatchFilter(weight)(entities) == expected
+
+
+def test_weighted_match_filter_split() -> None:
+    entities = [Entity(6, 8, "LOC", 1.0), Entity(0, 3, "LOC", 0.5), Entity(2, 7, "ORG", 2.0)]
+    filtered, dropped = WeightedMatchFilter().split(entities)
+    assert filtered == [Entity(2, 7, "ORG", 2.0)]
+    assert dropped == [Entity(0, 3, "LOC", 0.5), Entity(6, 8, "LOC", 1.0)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_weighted_match_filter_maximizes_total_weight(seed: int) -> None:
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(12):
+        start_offset = rng.randrange(20)
+        entities.append(Entity(start_offset, start_offset + rng.randrange(5), "LOC", rng.choice([0.5, 1.0, 2.0])))
+
+    best = 0.0
+    for mask in range(1 << len(entities)):
+        subset = [entity for i, entity in enumerate(entities) if mask >> i & 1]
+        if all(not overlap(a, b) for i, a in enumerate(subset) for b in subset[i + 1 :]):
+            best = max(best, sum(entity.score for entity in subset))
+
+    filtered, dropped = WeightedMatchFilter().split(entities)
+    assert sum(entity.score for entity in filtered) == best
+    assert all(not overlap(a, b) for i, a in enumerate(filtered) for b in filtered[i + 1 :])
+    assert sorted(filtered + dropped, key=repr) == sorted(entities, key=repr)
+
+
+@pytest.mark.parametrize(
+    "entity_filter",
+    [
+        LongestMatchFilter(),
+        MaximizedMatchFilter(),
+        WeightedMatchFilter(),
+        WeightedMatchFilter(lambda entity: len(entity)),
+    ],
+)
+@pytest.mark.parametrize("seed", range(3))
+def test_filter_entity_batch(entity_filter: EntityFilter, seed: int) -> None:
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(50):
+        start_offset = rng.randrange(40)
+        entities.append(Entity(start_offset, start_offset + rng.randrange(6), rng.choice(["LOC", "ORG"])))
+    batch = EntityBatch.from_entities(entities)
+    assert list(entity_filter.filter_entity_batch(batch)) == entity_filter(entities)
+
+
+@pytest.mark.parametrize(
+    "entity_filter",
+    [
+        LongestMatchFilter(),
+        LongestMatchFilter(max_length=6),
+        MaximizedMatchFilter(),
+        WeightedMatchFilter(),
+    ],
+)
+@pytest.mark.parametrize("seed", range(3))
+def test_iter_filter(entity_filter: EntityFilter, seed: int) -> None:
+    rng = random.Random(seed)
+    entities = []
+    for _ in range(50):
+        start_offset = rng.randrange(40)
+        entities.append(Entity(start_offset, start_offset + rng.randrange(6), rng.choice(["LOC", "ORG"])))
+    entities.sort(key=lambda entity: (entity.end_offset, entity.start_offset))
+    assert list(entity_filter.iter_filter(iter(entities))) == entity_filter(entities)
+
+
+@pytest.mark.parametrize("entity_filter", [LongestMatchFilter(max_length=6), MaximizedMatchFilter()])
+def test_iter_filter_raises_value_error_for_unordered_entities(entity_filter: EntityFilter) -> None:
+    with pytest.raises(ValueError):
+        list(entity_filter.iter_filter([Entity(6, 8, "LOC"), Entity(0, 3, "LOC")]))
+
+
+def test_longest_match_filter_iter_filter_raises_value_error_for_long_entity() -> None:
+    with pytest.raises(ValueError):
+        list(LongestMatchFilter(max_length=2).iter_filter([Entity(0, 3, "LOC")]))
+
+
+def test_longest_match_filter_raises_value_error_for_invalid_max_length() -> None:
+    with pytest.raises(ValueError):
+        LongestMatchFilter(max_length=0)
@@ -1,9 +1,18 @@
-from typing import Dict, List
+import pickle
+import random
+import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
 
+import ahocorasick
 import pytest
 
-from seqlabel.core import Entity, StringSequence
-from seqlabel.matchers import DictionaryMatcher
+import seqlabel.matchers
+from seqlabel.core import Entity, LabelVocab, StringSequence, Text, TokenizedText
+from seqlabel.matchers import CompositeMatcher, DictionaryMatcher, Matcher, RegexMatcher, ShardedDictionaryMatcher
 
 
 @pytest.fixture
@@ -32,3 +41,449 @@ def test_dictionary_matcher_match_tokenized_text_ja(
     dictionary_matcher.add(patterns)
     entities = dictionary_matcher.match(tokenized_text_ja)
     assert entities == expected
+
+
+@pytest.mark.parametrize("expected", [[Entity(6, 7, "LOC"), Entity(6, 8, "LOC"), Entity(7, 8, "LOC")]])
+def test_dictionary_matcher_save_and_load(
+    dictionary_matcher: DictionaryMatcher,
+    text_ja: StringSequence,
+    patterns: Dict,
+    expected: List[Entity],
+    tmp_path: Path,
+) -> None:
+    dictionary_matcher.add(patterns)
+    path = tmp_path / "automaton.bin"
+    dictionary_matcher.save(path)
+    loaded = DictionaryMatcher.load(path)
+    assert loaded.match(text_ja) == expected
+
+
+def test_dictionary_matcher_load_raises_value_error_with_object_automaton(patterns: Dict, tmp_path: Path) -> None:
+    matcher = DictionaryMatcher()
+    matcher.add(patterns)
+    path = tmp_path / "automaton.bin"
+    matcher.save(path)
+    automaton = ahocorasick.Automaton()
+    automaton.add_word("東京", ("LOC", 2))
+    automaton.make_automaton()
+    automaton.save(str(path), pickle.dumps)
+    with pytest.raises(ValueError):
+        DictionaryMatcher.load(path)
+
+
+def test_dictionary_matcher_load_raises_value_error_with_other_options(patterns: Dict, tmp_path: Path) -> None:
+    matcher = DictionaryMatcher(normalization="NFKC", casefold=True)
+    matcher.add(patterns)
+    path = tmp_path / "automaton.bin"
+    matcher.save(path)
+    loaded = DictionaryMatcher.load(path, normalization="NFKC", casefold=True)
+    assert loaded.match(Text("東京")) == [Entity(0, 1, "LOC")]
+    with pytest.raises(ValueError):
+        DictionaryMatcher.load(path)
+    with pytest.raises(ValueError):
+        DictionaryMatcher.load(path, normalization="NFKC")
+
+
+def test_dictionary_matcher_shares_vocab(text_ja: StringSequence, tmp_path: Path) -> None:
+    vocab = LabelVocab(["MISC"])
+    matcher = DictionaryMatcher(vocab=vocab)
+    matcher.add({"東京": "LOC", "首都": ("MISC", 0.5)})
+    batch = matcher.match_entity_batch(text_ja)
+    assert batch.vocab is matcher.vocab is vocab
+    assert list(batch.label_ids) == [0, 1]
+    assert list(batch) == matcher.match(text_ja) == [Entity(3, 4, "MISC", 0.5), Entity(6, 7, "LOC")]
+
+    path = tmp_path / "automaton.bin"
+    matcher.save(path)
+    other_vocab = LabelVocab(["ORG", "LOC"])
+    loaded = DictionaryMatcher.load(path, vocab=other_vocab)
+    assert list(loaded.match_entity_batch(text_ja).label_ids) == [2, 1]
+    assert loaded.match(text_ja) == matcher.match(text_ja)
+
+
+@pytest.mark.parametrize("removals,expected", [(["京都"], [Entity(6, 7, "LOC"), Entity(6, 8, "LOC")])])
+def test_dictionary_matcher_remove(
+    dictionary_matcher: DictionaryMatcher,
+    text_ja: StringSequence,
+    patterns: Dict,
+    removals: List[str],
+    expected: List[Entity],
+) -> None:
+    dictionary_matcher.add(patterns)
+    dictionary_matcher.remove(removals)
+    assert dictionary_matcher.match(text_ja) == expected
+
+
+@pytest.mark.parametrize(
+    "additions,removals,expected",
+    [
+        (
+            {"日本": "LOC", "首都": "MISC"},
+            ["東京", "京都"],
+            [Entity(0, 1, "LOC"), Entity(3, 4, "MISC"), Entity(6, 8, "LOC")],
+        )
+    ],
+)
+def test_dictionary_matcher_update(
+    dictionary_matcher: DictionaryMatcher,
+    text_ja: StringSequence,
+    patterns: Dict,
+    additions: Dict,
+    removals: List[str],
+    expected: List[Entity],
+) -> None:
+    dictionary_matcher.add(patterns)
+    before = dictionary_matcher.match(text_ja)
+    future = dictionary_matcher.update(additions, removals)
+    assert dictionary_matcher.match(text_ja) in (before, expected)
+    future.result()
+    assert dictionary_matcher.match(text_ja) == expected
+
+
+@pytest.mark.parametrize(
+    "tokens,space_after,patterns",
+    [
+        (
+            ["日本", "の", "首都", "は", "東京", "都", "です", "。"],
+            [False] * 8,
+            {"東京": "LOC", "東京都": "LOC", "京都": "LOC"},
+        ),
+        (
+            ["New", "York", "is", "not", "York", "."],
+            [True, True, True, True, False, False],
+            {"New York": "LOC", "York": "LOC", "New": "MISC", "ew Yo": "MISC", "is not": "MISC", "York.": "MISC"},
+        ),
+        (
+            ["a", "a", "a", "b", "ab", "a"],
+            [False] * 6,
+            {"a": "A", "aa": "A", "aab": "B", "ba": "B", "bab": "B", "aaba": "C"},
+        ),
+    ],
+)
+def test_dictionary_matcher_match_token_boundary(tokens: List[str], space_after: List[bool], patterns: Dict) -> None:
+    text = TokenizedText(tokens, space_after)
+    matcher = DictionaryMatcher()
+    matcher.add(patterns)
+    token_boundary_matcher = DictionaryMatcher(token_boundary=True)
+    token_boundary_matcher.add(patterns)
+    assert token_boundary_matcher.match(text) == matcher.match(text)
+
+
+@pytest.mark.parametrize(
+    "patterns,expected",
+    [({"東京": ("LOC", 0.5), "東京都": "LOC"}, [Entity(6, 7, "LOC", 0.5), Entity(6, 8, "LOC", 1.0)])],
+)
+@pytest.mark.parametrize("token_boundary", [False, True])
+def test_dictionary_matcher_match_with_scores(
+    tokenized_text_ja: StringSequence, patterns: Dict, expected: List[Entity], token_boundary: bool
+) -> None:
+    matcher = DictionaryMatcher(token_boundary=token_boundary)
+    matcher.add(patterns)
+    assert matcher.match(tokenized_text_ja) == expected
+
+
+@pytest.mark.parametrize("token_boundary", [False, True])
+def test_dictionary_matcher_match_entity_batch(
+    tokenized_text_ja: StringSequence, text_ja: StringSequence, patterns: Dict, token_boundary: bool
+) -> None:
+    matcher = DictionaryMatcher(token_boundary=token_boundary)
+    matcher.add(patterns)
+    for text in (text_ja, tokenized_text_ja):
+        assert list(matcher.match_entity_batch(text)) == matcher.match(text)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (
+            Text("ﾄｳｷｮｳのｶﾞｽ会社はＴＯＫＹＯ"),
+            [Entity(6, 8, "ORG"), Entity(6, 10, "ORG"), Entity(9, 10, "MISC"), Entity(12, 16, "LOC")],
+        ),
+        # A half-width voiced sound mark belongs to the preceding character, so "カ" does not match.
+        (Text("ｶﾞ"), []),
+        # "会社" covers only a part of "㍿", which is normalized to "株式会社".
+        (Text("ガス㍿"), [Entity(0, 1, "ORG"), Entity(2, 2, "ORG")]),
+        (
+            TokenizedText(["ｶﾞｽ", "会社", "は", "Tokyo"], [False, False, True, False]),
+            [Entity(0, 2, "ORG"), Entity(0, 4, "ORG"), Entity(3, 4, "MISC"), Entity(7, 11, "LOC")],
+        ),
+    ],
+)
+@pytest.mark.parametrize("token_boundary", [False, True])
+def test_dictionary_matcher_match_normalized(
+    text: StringSequence, expected: List[Entity], token_boundary: bool
+) -> None:
+    matcher = DictionaryMatcher(token_boundary=token_boundary, normalization="NFKC", casefold=True)
+    matcher.add({"ガス": "ORG", "ガス会社": "ORG", "株式会社": "ORG", "tokyo": "LOC", "カ": "MISC", "会社": "MISC"})
+    assert matcher.match(text) == expected
+    assert list(matcher.match_entity_batch(text)) == expected
+
+
+def test_dictionary_matcher_normalized_remove_and_load(tmp_path: Path) -> None:
+    matcher = DictionaryMatcher(normalization="NFKC", casefold=True)
+    matcher.add({"ＴＯＫＹＯ": "LOC", "Kyoto": "LOC"})
+    matcher.remove(["kyoto"])
+    path = tmp_path / "automaton.bin"
+    matcher.save(path)
+    loaded = DictionaryMatcher.load(path, normalization="NFKC", casefold=True)
+    assert loaded.match(Text("Tokyo and KYOTO")) == [Entity(0, 4, "LOC")]
+
+
+def test_dictionary_matcher_raises_value_error_for_unknown_normalization() -> None:
+    with pytest.raises(ValueError):
+        DictionaryMatcher(normalization="NFX")
+
+
+@pytest.fixture
+def regex_patterns() -> Dict:
+    return {r"\d{4}-\d{2}-\d{2}": "DATE", r"\d+円": ("MONEY", 0.5), r"ID-(?P<number>\d+)": "ID", r"x*": "EMPTY"}
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (
+            Text("2021-08-01に100円をID-42で"),
+            [Entity(0, 9, "DATE"), Entity(11, 14, "MONEY", 0.5), Entity(16, 20, "ID")],
+        ),
+        (
+            TokenizedText(["2021-08-01", "に", "100", "円", "をID-", "42"], [False] * 6),
+            [Entity(0, 9, "DATE"), Entity(11, 14, "MONEY", 0.5)],
+        ),
+    ],
+)
+def test_regex_matcher_match(regex_patterns: Dict, text: StringSequence, expected: List[Entity]) -> None:
+    matcher = RegexMatcher()
+    matcher.add(regex_patterns)
+    assert matcher.match(text) == expected
+    assert list(matcher.match_entity_batch(text)) == expected
+
+
+def test_regex_matcher_prefers_first_pattern(text_ja: StringSequence) -> None:
+    matcher = RegexMatcher(flags=re.IGNORECASE)
+    matcher.add({"東京": "LOC"})
+    matcher.add({"東京都": "GPE", "tokyo": "LOC"})
+    assert matcher.match(text_ja) == [Entity(6, 7, "LOC")]
+    assert matcher.match(Text("TOKYO")) == [Entity(0, 4, "LOC")]
+
+
+def test_regex_matcher_can_be_pickled(regex_patterns: Dict, text_ja: StringSequence) -> None:
+    matcher = RegexMatcher()
+    assert matcher.match(text_ja) == []
+    matcher.add(regex_patterns)
+    restored = pickle.loads(pickle.dumps(matcher))
+    text = Text("ID-42")
+    assert restored.match(text) == matcher.match(text) == [Entity(0, 4, "ID")]
+
+
+def test_regex_matcher_overlapped() -> None:
+    pytest.importorskip("regex")
+    matcher = RegexMatcher(overlapped=True)
+    matcher.add({r"\d+円": "MONEY"})
+    assert matcher.match(Text("100円")) == [Entity(0, 3, "MONEY"), Entity(1, 3, "MONEY"), Entity(2, 3, "MONEY")]
+
+
+class ReversedMatcher(Matcher):
+    def __init__(self, matcher: Matcher) -> None:
+        self._matcher = matcher
+
+    def add(self, patterns: Dict) -> None:
+        self._matcher.add(patterns)
+
+    def match(self, text: StringSequence) -> List[Entity]:
+        return self._matcher.match(text)[::-1]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_composite_matcher_match(
+    text_ja: StringSequence, tokenized_text_ja: StringSequence, patterns: Dict, max_workers: int
+) -> None:
+    dictionary_matcher = DictionaryMatcher(normalization="NFKC")
+    dictionary_matcher.add(patterns)
+    regex_matcher = RegexMatcher()
+    regex_matcher.add({"日本|首都": "MISC", "都": "MISC"})
+    custom_matcher = ReversedMatcher(DictionaryMatcher())
+    custom_matcher.add({"首都は東京": "MISC"})
+    matchers = [dictionary_matcher, regex_matcher, custom_matcher]
+    composite_matcher = CompositeMatcher(matchers, max_workers=max_workers)
+
+    for text in (text_ja, tokenized_text_ja):
+        expected = sorted(
+            (entity for matcher in matchers for entity in matcher.match(text)),
+            key=lambda entity: (entity.end_offset, entity.start_offset),
+        )
+        assert composite_matcher.match(text) == expected
+        assert list(composite_matcher.match_entity_batch(text)) == expected
+    assert pickle.loads(pickle.dumps(composite_matcher)).match(text_ja) == composite_matcher.match(text_ja)
+
+
+def test_composite_matcher_shares_normalized_text(text_ja: StringSequence) -> None:
+    matchers = [DictionaryMatcher(normalization="NFKC", casefold=True) for _ in range(2)]
+    matchers[0].add({"東京": "LOC"})
+    matchers[1].add({"京都": "LOC"})
+    assert CompositeMatcher(matchers).match(text_ja) == [Entity(6, 7, "LOC"), Entity(7, 8, "LOC")]
+    assert matchers[0]._normalizer is matchers[1]._normalizer
+
+
+def test_composite_matcher_shares_vocab(text_ja: StringSequence) -> None:
+    vocab = LabelVocab()
+    matchers = [DictionaryMatcher(vocab=vocab) for _ in range(2)]
+    matchers[0].add({"東京": "LOC"})
+    matchers[1].add({"首都": "MISC"})
+    batch = CompositeMatcher(matchers).match_entity_batch(text_ja)
+    assert batch.vocab is vocab
+    assert list(batch.label_ids) == [1, 0]
+    other_matcher = DictionaryMatcher()
+    other_matcher.add({"日本": "LOC"})
+    assert CompositeMatcher([matchers[0], other_matcher]).match_entity_batch(text_ja).vocab is not vocab
+
+
+def test_composite_matcher_keeps_no_text() -> None:
+    matchers = [DictionaryMatcher(normalization="NFKC") for _ in range(2)]
+    matchers[0].add({"ｶﾞ": "KANA"})
+    matchers[1].add({"ガギグ": "KANA"})
+    text = Text("ｶﾞｷﾞ")
+    assert CompositeMatcher(matchers).match(text) == [Entity(0, 1, "KANA")]
+    ref = weakref.ref(text)
+    del text
+    assert ref() is None
+
+
+@pytest.mark.parametrize("add_to,versions", [(0, [2, 0]), (-1, [1, 1])])
+def test_composite_matcher_add(text_ja: StringSequence, add_to: int, versions: List[int]) -> None:
+    matchers = [DictionaryMatcher(), RegexMatcher()]
+    matchers[0].add({"首都": "MISC"})
+    composite_matcher = CompositeMatcher(matchers, add_to=add_to)
+    composite_matcher.add({"日本": "LOC"})
+    assert composite_matcher.match(text_ja) == [Entity(0, 1, "LOC"), Entity(3, 4, "MISC")]
+    assert [matcher.version for matcher in matchers] == versions
+
+
+def test_composite_matcher_raises_value_error_with_add_to() -> None:
+    with pytest.raises(ValueError):
+        CompositeMatcher([DictionaryMatcher()], add_to=1)
+
+
+@pytest.mark.parametrize(
+    "matcher",
+    [
+        DictionaryMatcher(),
+        DictionaryMatcher(token_boundary=True),
+        DictionaryMatcher(normalization="NFKC", casefold=True),
+        RegexMatcher(),
+        CompositeMatcher([DictionaryMatcher(), RegexMatcher()]),
+    ],
+)
+def test_matcher_iter_match(text_ja: StringSequence, tokenized_text_ja: StringSequence, matcher: Matcher) -> None:
+    matcher = pickle.loads(pickle.dumps(matcher))
+    if isinstance(matcher, CompositeMatcher):
+        matcher.matchers[0].add({"東京": "LOC", "東京都": "LOC"})
+        matcher.matchers[1].add({"日本|京都": "MISC"})
+    else:
+        matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "MISC"})
+    for text in (text_ja, tokenized_text_ja):
+        assert list(matcher.iter_match(text)) == matcher.match(text)
+
+
+@pytest.mark.parametrize("shard_by", ["prefix", "label"])
+def test_sharded_dictionary_matcher_match(
+    tmp_path: Path, text_ja: StringSequence, tokenized_text_ja: StringSequence, shard_by: str
+) -> None:
+    patterns = {"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC", "首都": "MISC", "都": ("MISC", 0.5)}
+    matcher = ShardedDictionaryMatcher(tmp_path, shard_by=shard_by, n_shards=4, max_loaded_shards=1)
+    matcher.add(patterns)
+    expected_matcher = DictionaryMatcher()
+    expected_matcher.add(patterns)
+
+    for text in (text_ja, tokenized_text_ja):
+        assert matcher.match(text) == expected_matcher.match(text)
+        assert list(matcher.iter_match(text)) == expected_matcher.match(text)
+    stats = matcher.get_stats()
+    assert sum(shard["patterns"] for shard in stats.values()) == len(patterns)
+    assert sum(shard["loaded"] for shard in stats.values()) == 1
+    assert pickle.loads(pickle.dumps(matcher)).match(text_ja) == matcher.match(text_ja)
+
+    matcher.remove(["都"])
+    expected_matcher.remove(["都"])
+    reopened = ShardedDictionaryMatcher(tmp_path, shard_by=shard_by, n_shards=4)
+    assert reopened.match(text_ja) == expected_matcher.match(text_ja)
+
+
+def test_sharded_dictionary_matcher_queries_shards_of_text_characters(tmp_path: Path) -> None:
+    matcher = ShardedDictionaryMatcher(tmp_path, n_shards=64, normalization="NFKC", casefold=True)
+    matcher.add({"Tokyo": "LOC", "京都": "LOC"})
+    assert matcher.match(Text("ＴＯＫＹＯ")) == [Entity(0, 4, "LOC")]
+    assert sorted(shard["queries"] for shard in matcher.get_stats().values()) == [0, 1]
+
+
+def test_sharded_dictionary_matcher_raises_value_error_for_different_options(tmp_path: Path) -> None:
+    ShardedDictionaryMatcher(tmp_path, n_shards=4).add({"東京": "LOC"})
+    with pytest.raises(ValueError):
+        ShardedDictionaryMatcher(tmp_path, n_shards=8)
+
+
+@pytest.mark.parametrize(
+    "matcher",
+    [
+        DictionaryMatcher(),
+        DictionaryMatcher(token_boundary=True),
+        DictionaryMatcher(normalization="NFKC", casefold=True),
+        RegexMatcher(),
+    ],
+)
+def test_matcher_match_batch(text_ja: StringSequence, tokenized_text_ja: StringSequence, matcher: Matcher) -> None:
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC", "。東": "X", "本の": "X"})
+    texts = [text_ja, tokenized_text_ja, Text(""), Text("東京"), Text("ＴＯＫＹＯ。"), text_ja]
+    assert matcher.match_batch(texts) == [matcher.match(text) for text in texts]
+    assert matcher.match_batch([]) == []
+
+
+@pytest.mark.parametrize("normalization,casefold", [(None, False), ("NFKC", True), ("NFC", False), ("NFD", False)])
+@pytest.mark.parametrize("seed", range(3))
+def test_dictionary_matcher_iter_match_chunks(normalization: Optional[str], casefold: bool, seed: int) -> None:
+    rng = random.Random(seed)
+    alphabet = "abcAB́̀eｶﾞ㌀é"
+    matcher = DictionaryMatcher(normalization=normalization, casefold=casefold)
+    matcher.add({"".join(rng.choices(alphabet, k=rng.randint(1, 4))): "X" for _ in range(40)})
+    for _ in range(50):
+        document = "".join(rng.choices(alphabet, k=rng.randint(0, 60)))
+        cuts = sorted(rng.sample(range(len(document) + 1), rng.randint(0, min(10, len(document) + 1))))
+        chunks = [document[start:end] for start, end in zip([0] + cuts, cuts + [len(document)])]
+        assert list(matcher.iter_match_chunks(chunks)) == matcher.match(Text(document))
+
+
+@pytest.mark.parametrize("normalization", [None, "NFKC"])
+def test_dictionary_matcher_iter_match_chunks_with_single_characters(normalization: Optional[str]) -> None:
+    matcher = DictionaryMatcher(normalization=normalization)
+    matcher.add({"a": "X", "b": "Y"})
+    assert list(matcher.iter_match_chunks(["ab", "ba"])) == matcher.match(Text("abba"))
+
+
+def test_dictionary_matcher_learns_characters_in_threads() -> None:
+    # Each thread brings its own squared katakana, which a fresh normalizer has not seen yet.
+    patterns = {"アパート": "X", "センチ": "Y"}
+    texts = [Text("".join(chr(cp) for cp in range(0x3300 + i, 0x3358, 4))) for i in range(4)]
+
+    def match(text: Text) -> List[Entity]:
+        barrier.wait()
+        matcher = DictionaryMatcher(normalization="NFKC")
+        matcher.add(patterns)
+        return matcher.match(text)
+
+    for _ in range(50):
+        seqlabel.matchers._get_normalizer.cache_clear()
+        barrier = threading.Barrier(len(texts))
+        with ThreadPoolExecutor(len(texts)) as executor:
+            results = list(executor.map(match, texts))
+        matcher = DictionaryMatcher(normalization="NFKC")
+        matcher.add(patterns)
+        assert results == [matcher.match(text) for text in texts]
+
+
+def test_dictionary_matcher_max_length() -> None:
+    matcher = DictionaryMatcher(normalization="NFKC")
+    assert matcher.max_length == 0
+    matcher.add({"東京": "LOC", "㍿": "ORG"})
+    assert matcher.max_length == 4
+    matcher.remove(["㍿"])
+    assert matcher.max_length == 4
@@ -0,0 +1,60 @@
+from typing import List
+
+import pytest
+
+from seqlabel.cache import CacheInfo
+from seqlabel.core import StringSequence, Text
+from seqlabel.entity_filters import LongestMatchFilter
+from seqlabel.matchers import DictionaryMatcher
+from seqlabel.pipeline import Pipeline
+from seqlabel.serializers import IOB2Serializer
+
+
+@pytest.fixture
+def pipeline() -> Pipeline:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    return Pipeline(matcher, LongestMatchFilter(), IOB2Serializer())
+
+
+@pytest.fixture
+def texts(text_ja: StringSequence, tokenized_text_ja: StringSequence) -> List[StringSequence]:
+    return [text_ja, tokenized_text_ja, Text("京都と東京"), Text("大阪")] * 5
+
+
+def test_pipeline_call(pipeline: Pipeline, tokenized_text_ja: StringSequence) -> None:
+    expected = "日本\tB-LOC\nの\tO\n首都\tO\nは\tO\n東京\tB-LOC\n都\tI-LOC\nです\tO\n。\tO"
+    assert pipeline(tokenized_text_ja) == expected
+
+
+@pytest.mark.parametrize("n_process,chunk_size", [(1, 1000), (2, 1), (2, 3), (-1, 4)])
+def test_pipeline_pipe(pipeline: Pipeline, texts: List[StringSequence], n_process: int, chunk_size: int) -> None:
+    expected = [pipeline(text) for text in texts]
+    assert list(pipeline.pipe(texts, n_process=n_process, chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize("n_process,chunk_size", [(0, 1), (2, 0)])
+def test_pipeline_pipe_raises_value_error(
+    pipeline: Pipeline, texts: List[StringSequence], n_process: int, chunk_size: int
+) -> None:
+    with pytest.raises(ValueError):
+        list(pipeline.pipe(texts, n_process=n_process, chunk_size=chunk_size))
+
+
+def test_pipeline_lazy(pipeline: Pipeline, texts: List[StringSequence]) -> None:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    lazy_pipeline = Pipeline(matcher, LongestMatchFilter(max_length=3), IOB2Serializer(), lazy=True)
+    assert [lazy_pipeline(text) for text in texts] == [pipeline(text) for text in texts]
+
+
+def test_pipeline_cache(pipeline: Pipeline, texts: List[StringSequence]) -> None:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    cached_pipeline = Pipeline(matcher, LongestMatchFilter(), IOB2Serializer(), cache_size=8)
+    assert [cached_pipeline(text) for text in texts] == [pipeline(text) for text in texts]
+    assert cached_pipeline.cache_info() == CacheInfo(hits=16, misses=4, maxsize=8, currsize=4)
+    assert pipeline.cache_info() is None
+
+    matcher.add({"大阪": "LOC"})
+    assert cached_pipeline(Text("大阪")) == "大\tB-LOC\n阪\tI-LOC"
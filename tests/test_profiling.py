@@ -0,0 +1,112 @@
+import pickle
+from typing import Dict, Iterator, List, Tuple
+
+import pytest
+
+from seqlabel.core import Entity, StringSequence, Text
+from seqlabel.entity_filters import LongestMatchFilter
+from seqlabel.matchers import DictionaryMatcher
+from seqlabel.pipeline import Pipeline
+from seqlabel.profiling import Profiler, PrometheusCallback
+from seqlabel.serializers import IOB2Serializer
+
+
+@pytest.fixture
+def matcher() -> DictionaryMatcher:
+    matcher = DictionaryMatcher()
+    matcher.add({"東京": "LOC", "東京都": "LOC", "京都": "LOC", "日本": "LOC"})
+    return matcher
+
+
+def test_profiler_records_stages(matcher: DictionaryMatcher, tokenized_text_ja: StringSequence) -> None:
+    calls: List[Tuple[str, Dict[str, int]]] = []
+    profiler = Profiler(callbacks=[lambda stage, seconds, counts: calls.append((stage, counts))])
+    pipeline = Pipeline(
+        profiler.matcher(matcher), profiler.entity_filter(LongestMatchFilter()), profiler.serializer(IOB2Serializer())
+    )
+    expected = Pipeline(matcher, LongestMatchFilter(), IOB2Serializer())(tokenized_text_ja)
+
+    assert pipeline(tokenized_text_ja) == expected
+    assert calls == [
+        ("match", {"entities": 3, "rejected_alignments": 1}),
+        ("filter", {"candidates": 3, "entities": 2}),
+        ("serialize", {"entities": 2}),
+    ]
+    stats = profiler.stats
+    assert stats["match"]["calls"] == 1
+    assert stats["match"]["rejected_alignments"] == 1
+    assert stats["filter"]["candidates"] == 3
+    assert all(stats[stage]["seconds"] >= 0 for stage in ("match", "filter", "serialize"))
+
+    profiler.reset()
+    assert profiler.stats == {}
+
+
+def test_profiler_records_entity_batch(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    profiler = Profiler()
+    batch = profiler.matcher(matcher).match_entity_batch(text_ja)
+    filtered = profiler.entity_filter(LongestMatchFilter()).filter_entity_batch(batch)
+
+    assert list(filtered) == LongestMatchFilter()(matcher.match(text_ja))
+    assert profiler.stats["match"]["entities"] == 4
+    assert profiler.stats["match"]["rejected_alignments"] == 0
+    assert profiler.stats["filter"]["entities"] == 2
+
+
+def test_profiler_records_lazy_stages(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    profiler = Profiler()
+    pipeline = Pipeline(
+        profiler.matcher(matcher),
+        profiler.entity_filter(LongestMatchFilter(max_length=3)),
+        IOB2Serializer(),
+        lazy=True,
+    )
+
+    assert pipeline(text_ja) == Pipeline(matcher, LongestMatchFilter(), IOB2Serializer())(text_ja)
+    stats = profiler.stats
+    assert stats["match"]["calls"] == 1
+    assert stats["match"]["entities"] == 4
+    assert stats["filter"]["candidates"] == 4
+    assert stats["filter"]["entities"] == 2
+
+
+def test_profiled_entity_filter_iter_filter_is_lazy() -> None:
+    consumed: List[Entity] = []
+
+    def candidates() -> Iterator[Entity]:
+        for entity in [Entity(0, 1, "A"), Entity(5, 6, "B"), Entity(10, 11, "C")]:
+            consumed.append(entity)
+            yield entity
+
+    profiler = Profiler()
+    filtered = profiler.entity_filter(LongestMatchFilter(max_length=2)).iter_filter(candidates())
+    assert next(filtered) == Entity(0, 1, "A")
+    assert len(consumed) == 2
+    assert list(filtered) == [Entity(5, 6, "B"), Entity(10, 11, "C")]
+    assert profiler.stats["filter"]["entities"] == 3
+
+
+def test_profiled_components_delegate_attributes(matcher: DictionaryMatcher) -> None:
+    profiler = Profiler()
+    profiled = profiler.matcher(matcher)
+    profiled.remove(["日本"])
+    assert profiled.match(Text("日本")) == []
+    assert profiler.serializer(IOB2Serializer()).tag_vocab == ["O"]
+
+
+def test_profiler_can_be_pickled(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    profiler = Profiler()
+    profiler.matcher(matcher).match(text_ja)
+    restored = pickle.loads(pickle.dumps(profiler))
+    assert restored.stats == profiler.stats
+    restored.record("match", 0.0, {})
+
+
+def test_prometheus_callback(matcher: DictionaryMatcher, text_ja: StringSequence) -> None:
+    prometheus_client = pytest.importorskip("prometheus_client")
+    registry = prometheus_client.CollectorRegistry()
+    profiler = Profiler(callbacks=[PrometheusCallback(registry=registry)])
+    profiler.matcher(matcher).match(text_ja)
+
+    assert registry.get_sample_value("seqlabel_stage_calls_total", {"stage": "match"}) == 1
+    assert registry.get_sample_value("seqlabel_stage_items_total", {"stage": "match", "name": "entities"}) == 4
@@ -1,10 +1,10 @@
 import json
-from typing import List
+from typing import Dict, List, Union
 
 import pytest
 
-from seqlabel.core import Entity, StringSequence
-from seqlabel.serializers import BILOUSerializer, IOB2Serializer, IOBESSerializer, JSONLSerializer
+from seqlabel.core import Entity, EntityBatch, LabelVocab, StringSequence
+from seqlabel.serializers import BILOUSerializer, IOB2Serializer, IOBESSerializer, JSONLSerializer, TaggingSerializer
 
 
 @pytest.mark.parametrize(
@@ -61,3 +61,131 @@ def test_iobes_serializer_save(text_ja: StringSequence, entities: List[Entity],
 def test_bilou_serializer_save(text_ja: StringSequence, entities: List[Entity], expected: str) -> None:
     serializer = BILOUSerializer()
     assert serializer.save(text_ja, entities) == expected
+
+
+@pytest.mark.parametrize("serializer", [JSONLSerializer(), IOB2Serializer(), IOBESSerializer(), BILOUSerializer()])
+def test_serializer_save_entity_batch(
+    tokenized_text_ja: StringSequence, serializer: Union[JSONLSerializer, TaggingSerializer]
+) -> None:
+    entities = [Entity(0, 1, "LOC"), Entity(6, 8, "LOC")]
+    assert serializer.save(tokenized_text_ja, EntityBatch.from_entities(entities)) == serializer.save(
+        tokenized_text_ja, entities
+    )
+
+
+@pytest.mark.parametrize(
+    "serializer,expected",
+    [
+        (IOB2Serializer(), "日本\tB-LOC\nの\tB-MISC\n首都\tO\nは\tO\n東京\tB-LOC\n都\tI-LOC\nです\tO\n。\tO"),
+        (IOBESSerializer(), "日本\tS-LOC\nの\tS-MISC\n首都\tO\nは\tO\n東京\tB-LOC\n都\tE-LOC\nです\tO\n。\tO"),
+        (BILOUSerializer(), "日本\tU-LOC\nの\tU-MISC\n首都\tO\nは\tO\n東京\tB-LOC\n都\tL-LOC\nです\tO\n。\tO"),
+    ],
+)
+def test_tagging_serializer_save_tokenized_text(
+    tokenized_text_ja: StringSequence, serializer: TaggingSerializer, expected: str
+) -> None:
+    entities = [Entity(0, 1, "LOC"), Entity(2, 2, "MISC"), Entity(6, 8, "LOC")]
+    assert serializer.save(tokenized_text_ja, entities) == expected
+
+
+@pytest.mark.parametrize("serializer", [IOB2Serializer(), IOBESSerializer(), BILOUSerializer()])
+def test_tagging_serializer_raises_value_error_with_overlapping_spans(
+    text_ja: StringSequence, serializer: TaggingSerializer
+) -> None:
+    with pytest.raises(ValueError):
+        serializer.save(text_ja, [Entity(6, 7, "LOC"), Entity(7, 8, "LOC")])
+
+
+@pytest.mark.parametrize(
+    "serializer,expected_ids,expected_vocab",
+    [
+        (IOB2Serializer(["MISC"]), [3, 1, 0, 0, 3, 4, 0, 0], ["O", "B-MISC", "I-MISC", "B-LOC", "I-LOC"]),
+        (
+            IOBESSerializer(),
+            [4, 8, 0, 0, 1, 3, 0, 0],
+            ["O", "B-LOC", "I-LOC", "E-LOC", "S-LOC", "B-MISC", "I-MISC", "E-MISC", "S-MISC"],
+        ),
+    ],
+)
+def test_tagging_serializer_encode(
+    tokenized_text_ja: StringSequence,
+    serializer: TaggingSerializer,
+    expected_ids: List[int],
+    expected_vocab: List[str],
+) -> None:
+    entities = [Entity(0, 1, "LOC"), Entity(2, 2, "MISC"), Entity(6, 8, "LOC")]
+    ids = serializer.encode(tokenized_text_ja, entities)
+    assert list(ids) == expected_ids
+    assert serializer.tag_vocab == expected_vocab
+    assert [serializer.tag_vocab[i] for i in ids] == [
+        line.split("\t")[1] for line in serializer.save(tokenized_text_ja, entities).split("\n")
+    ]
+
+
+@pytest.mark.parametrize(
+    "compact,expected",
+    [
+        (
+            False,
+            {"text": list("日本の首都は東京都です。"), "tags": [{"start_offset": 6, "end_offset": 8, "label": "LOC"}]},
+        ),
+        (True, {"text": "日本の首都は東京都です。", "tags": [{"start_offset": 6, "end_offset": 8, "label": "LOC"}]}),
+    ],
+)
+@pytest.mark.parametrize("backend", ["json", "auto"])
+def test_jsonl_serializer_save_compact(text_ja: StringSequence, compact: bool, expected: Dict, backend: str) -> None:
+    serializer = JSONLSerializer(compact=compact, backend=backend)
+    assert json.loads(serializer.save(text_ja, [Entity(6, 8, "LOC")])) == expected
+
+
+def test_jsonl_serializer_save_compact_tokenized_text(tokenized_text_ja: StringSequence) -> None:
+    serializer = JSONLSerializer(compact=True)
+    assert json.loads(serializer.save(tokenized_text_ja, [Entity(6, 8, "LOC")])) == {
+        "text": ["日本", "の", "首都", "は", "東京", "都", "です", "。"],
+        "space_after": [False] * 8,
+        "tags": [{"start_offset": 4, "end_offset": 5, "label": "LOC"}],
+    }
+
+
+def test_jsonl_serializer_orjson_backend(text_ja: StringSequence) -> None:
+    pytest.importorskip("orjson")
+    entities = [Entity(6, 8, "LOC")]
+    expected = json.dumps(
+        json.loads(JSONLSerializer().save(text_ja, entities)), ensure_ascii=False, separators=(",", ":")
+    )
+    assert JSONLSerializer(backend="orjson").save(text_ja, entities) == expected
+
+
+@pytest.mark.parametrize("backend", ["json", "auto"])
+def test_jsonl_serializer_save_many(text_ja: StringSequence, tokenized_text_ja: StringSequence, backend: str) -> None:
+    serializer = JSONLSerializer(compact=True, backend=backend)
+    documents = [(text_ja, [Entity(6, 8, "LOC")]), (tokenized_text_ja, [])]
+    assert serializer.save_many(documents) == "\n".join(serializer.save(text, entities) for text, entities in documents)
+
+
+def test_jsonl_serializer_raises_value_error_with_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        JSONLSerializer(backend="ujson")
+
+
+@pytest.mark.parametrize("serializer", [JSONLSerializer(), IOB2Serializer()])
+def test_serializer_save_iterator(
+    tokenized_text_ja: StringSequence, serializer: Union[JSONLSerializer, TaggingSerializer]
+) -> None:
+    entities = [Entity(0, 1, "LOC"), Entity(6, 8, "LOC")]
+    assert serializer.save(tokenized_text_ja, iter(entities)) == serializer.save(tokenized_text_ja, entities)
+
+
+def test_tagging_serializer_vocab(tokenized_text_ja: StringSequence) -> None:
+    vocab = LabelVocab(["MISC"])
+    serializer = IOB2Serializer(vocab=vocab)
+    other_serializer = IOB2Serializer(vocab=vocab)
+    entities = [Entity(0, 1, "LOC"), Entity(2, 2, "ORG"), Entity(6, 8, "LOC")]
+    batch = EntityBatch.from_entities(entities, vocab)
+
+    assert list(serializer.encode(tokenized_text_ja, batch)) == [3, 5, 0, 0, 3, 4, 0, 0]
+    assert serializer.tag_vocab == ["O", "B-MISC", "I-MISC", "B-LOC", "I-LOC", "B-ORG", "I-ORG"]
+    assert serializer.save(tokenized_text_ja, batch) == serializer.save(tokenized_text_ja, entities)
+    assert list(other_serializer.encode(tokenized_text_ja, entities)) == list(
+        serializer.encode(tokenized_text_ja, batch)
+    )
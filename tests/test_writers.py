@@ -0,0 +1,75 @@
+import gzip
+import io
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from seqlabel.core import Entity, StringSequence, Text
+from seqlabel.serializers import BILOUSerializer, JSONLSerializer
+from seqlabel.writers import CoNLLWriter, JSONLWriter
+
+Document = Tuple[StringSequence, List[Entity]]
+
+
+@pytest.fixture
+def documents(text_ja: StringSequence, tokenized_text_ja: StringSequence) -> List[Document]:
+    return [(text_ja, [Entity(6, 8, "LOC")]), (tokenized_text_ja, [Entity(0, 1, "LOC")]), (Text("京都"), [])]
+
+
+def test_jsonl_writer(documents: List[Document]) -> None:
+    file = io.StringIO()
+    with JSONLWriter(file) as writer:
+        assert writer.write_all(documents) == 3
+    serializer = JSONLSerializer()
+    assert file.getvalue() == "".join(serializer.save(text, entities) + "\n" for text, entities in documents)
+
+
+@pytest.mark.parametrize("buffer_size", [1, 1 << 20])
+def test_conll_writer(documents: List[Document], buffer_size: int) -> None:
+    file = io.StringIO()
+    with CoNLLWriter(file, BILOUSerializer(), buffer_size=buffer_size) as writer:
+        for text, entities in documents:
+            writer.write(text, entities)
+    serializer = BILOUSerializer()
+    assert file.getvalue() == "\n\n".join(serializer.save(text, entities) for text, entities in documents) + "\n"
+
+
+@pytest.mark.parametrize("filename", ["corpus.conll", "corpus.conll.gz"])
+def test_conll_writer_path(documents: List[Document], tmp_path: Path, filename: str) -> None:
+    path = tmp_path / filename
+    with CoNLLWriter(path) as writer:
+        writer.write_all(documents)
+    opener = gzip.open if filename.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:  # type: ignore
+        assert f.read().split("\n\n")[2] == "京\tO\n都\tO\n"
+
+
+def test_jsonl_writer_zstd(documents: List[Document], tmp_path: Path) -> None:
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "corpus.jsonl.zst"
+    with JSONLWriter(path) as writer:
+        writer.write_all(documents)
+    with zstandard.open(path, "rt", encoding="utf-8") as f:
+        assert len(f.read().splitlines()) == 3
+
+
+def test_writer_raises_value_error_with_compression_for_file_object() -> None:
+    with pytest.raises(ValueError):
+        JSONLWriter(io.StringIO(), compression="gzip")
+
+
+def test_writer_close_twice(documents: List[Document], tmp_path: Path) -> None:
+    file = io.StringIO()
+    with JSONLWriter(file) as writer:
+        writer.write_all(documents)
+        writer.close()
+    writer.close()
+    assert len(file.getvalue().splitlines()) == 3
+    assert file.getvalue().endswith("}\n")
+
+    path = tmp_path / "corpus.jsonl"
+    with JSONLWriter(path) as writer:
+        writer.write_all(documents)
+        writer.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3